@@ -0,0 +1,182 @@
+"""
+Gates of Olympus - Hot Path Benchmarks
+Reproducible throughput numbers for the spin pipeline and book output
+
+Usage (from math-sdk directory):
+    python benchmarks/bench_hot_path.py --counts 1000 10000 --output bench.json
+
+Results are JSON so runs from different commits can be diffed.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Any
+
+SDK_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SDK_PATH))
+sys.path.insert(0, str(SDK_PATH / 'game'))
+
+from game.game_config import GameConfig
+from game.gamestate import GameState
+from game.book_writer import BookWriter
+from run import make_book, make_lookup_entry
+
+
+def time_best(func: Callable[[], None], repeats: int) -> float:
+    """Best wall time of `repeats` runs"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_run_spin(config: GameConfig, count: int, record_events: bool = True) -> Callable[[], None]:
+    gamestate = GameState(config, record_events)
+
+    def run():
+        for sim in range(count):
+            gamestate.run_spin(sim)
+    return run
+
+
+def bench_run_spin_payout_only(config: GameConfig, count: int) -> Callable[[], None]:
+    """run_spin without event recording (optimization / RTP runs)"""
+    return bench_run_spin(config, count, record_events=False)
+
+
+def bench_freespin_sequence(config: GameConfig, count: int) -> Callable[[], None]:
+    """`count` forced free spin sequences with the default award"""
+    gamestate = GameState(config)
+    awarded = config.freespin_triggers.get(config.scatters_needed_for_trigger, 15)
+
+    def run():
+        for sim in range(count):
+            gamestate.reset_seed(sim)
+            gamestate.reset_book()
+            gamestate.freespins_awarded = awarded
+            gamestate.freespins_remaining = awarded
+            gamestate.run_freespin()
+    return run
+
+
+def bench_draw_board(config: GameConfig, count: int) -> Callable[[], None]:
+    gamestate = GameState(config)
+    gamestate.reset_seed(0)
+
+    def run():
+        for _ in range(count):
+            gamestate.draw_board('MODE_BASE')
+    return run
+
+
+def bench_generate_multipliers(config: GameConfig, count: int) -> Callable[[], None]:
+    gamestate = GameState(config)
+    gamestate.reset_seed(0)
+
+    def run():
+        for _ in range(count):
+            gamestate.generate_multipliers('MODE_FREESPIN')
+    return run
+
+
+def bench_scatter_pays(config: GameConfig, count: int) -> Callable[[], None]:
+    """calculate_scatter_pays alone on pre-drawn boards"""
+    gamestate = GameState(config)
+    gamestate.reset_seed(0)
+    boards = []
+    for _ in range(count):
+        gamestate.draw_board('MODE_BASE')
+        boards.append(gamestate.grid)
+
+    def run():
+        for board in boards:
+            gamestate.grid = board
+            gamestate.calculate_scatter_pays()
+    return run
+
+
+def bench_save_books(config: GameConfig, count: int) -> Callable[[], None]:
+    """BookWriter output (books, lookup table and offset index) of `count` pre-simulated books"""
+    gamestate = GameState(config)
+    entries = []
+    for sim in range(count):
+        result = gamestate.run_spin(sim)
+        entries.append((make_book(sim, result, 'base', 1.0), make_lookup_entry(sim, result)))
+
+    def run():
+        with tempfile.TemporaryDirectory() as library_path:
+            with BookWriter(Path(library_path), 'base') as writer:
+                for book, lookup_entry in entries:
+                    writer.write(book, lookup_entry)
+    return run
+
+
+BENCHMARKS = {
+    'run_spin_base': bench_run_spin,
+    'run_spin_payout_only': bench_run_spin_payout_only,
+    'freespin_sequence': bench_freespin_sequence,
+    'draw_board': bench_draw_board,
+    'generate_multipliers': bench_generate_multipliers,
+    'calculate_scatter_pays': bench_scatter_pays,
+    'save_books': bench_save_books,
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=SDK_PATH,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmarks(names: List[str], counts: List[int], repeats: int) -> Dict[str, Any]:
+    config = GameConfig()
+    results = {}
+    for name in names:
+        results[name] = {}
+        for count in counts:
+            seconds = time_best(BENCHMARKS[name](config, count), repeats)
+            results[name][str(count)] = {
+                'seconds': seconds,
+                'per_second': count / seconds if seconds else 0.0,
+            }
+            print(f"{name:<24} n={count:<9,} {count / seconds:>14,.0f}/s", file=sys.stderr)
+
+    return {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeats': repeats,
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--output', type=Path, help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmarks(args.only, args.counts, args.repeats)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
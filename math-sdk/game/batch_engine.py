@@ -0,0 +1,268 @@
+"""
+Gates of Olympus - Batch Spin Engine
+Vectorized NumPy evaluation of many spins at once
+GameState.run_spin remains the reference implementation
+"""
+
+from typing import Dict, Any
+
+from game_executables import cap_room
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for batch runs
+    np = None
+
+
+class BatchResult:
+    """Per-spin outcome arrays for one batch run"""
+
+    def __init__(self, payouts, base_payouts, freespins_triggered, freespins_played):
+        self.payouts = payouts
+        self.base_payouts = base_payouts
+        self.freespins_triggered = freespins_triggered
+        self.freespins_played = freespins_played
+
+    @property
+    def num_spins(self) -> int:
+        return int(self.payouts.size)
+
+    @property
+    def rtp(self) -> float:
+        """Mean payout multiplier in percent"""
+        return float(self.payouts.mean()) * 100 if self.payouts.size else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of spins with a non-zero payout"""
+        return float((self.payouts > 0).mean()) if self.payouts.size else 0.0
+
+    @property
+    def std_error(self) -> float:
+        """Standard error of the RTP estimate in percent"""
+        if self.payouts.size < 2:
+            return 0.0
+        return float(self.payouts.std(ddof=1) / np.sqrt(self.payouts.size)) * 100
+
+
+class BatchSpinEngine:
+    """
+    Evaluates whole batches of spins with array operations.
+
+    Boards are drawn as (N, cols, rows) arrays of symbol indices, where the
+    index is the position of the symbol in the mode's weight table. Wins,
+    scatter pays, multipliers and free spin sequences follow the same rules
+    as GameCalculations / GameState, so the payoutMultiplier distribution
+    matches the scalar path (the random streams differ).
+    """
+
+    def __init__(self, config):
+        if np is None:
+            raise ImportError("BatchSpinEngine requires numpy (pip install numpy)")
+        if config.tumble_enabled:
+            raise ValueError("BatchSpinEngine models static boards; disable tumble_enabled or simulate")
+
+        self.config = config
+        self.cells = config.cols * config.rows
+        self.tables = {
+            mode: self._build_mode_table(mode)
+            for mode in ('MODE_BASE', 'MODE_FREESPIN')
+        }
+
+        mult_weights = config.multiplier_weights
+        self.mult_values = np.array(list(mult_weights.keys()), dtype=np.float64)
+        mult_probs = np.array(list(mult_weights.values()), dtype=np.float64)
+        self.mult_cum = np.cumsum(mult_probs / mult_probs.sum())
+
+        # Free spins awarded per scatter count (same default as update_freespin_amount)
+        self.fs_awards = np.array(
+            [config.freespin_triggers.get(count, 15) for count in range(self.cells + 1)],
+            dtype=np.int64,
+        )
+
+    def _build_mode_table(self, mode: str) -> Dict[str, Any]:
+        """Precompute draw probabilities and pay lookup for one game mode"""
+        weights = self.config.get_symbol_weights(mode)
+        symbols = list(weights.keys())
+        probs = np.array(list(weights.values()), dtype=np.float64)
+
+        # pay[s, count] mirrors calculate_scatter_pays / calculate_scatter_payout
+        pay = np.zeros((len(symbols), self.cells + 1), dtype=np.float64)
+        scatter_index = -1
+        for index, symbol in enumerate(symbols):
+            paytable = self.config.paytable.get(symbol, [])
+            is_scatter = symbol.value == 'scatter'
+            if is_scatter:
+                scatter_index = index
+            min_count = 4 if is_scatter else 8
+            for count in range(min_count, min(len(paytable), self.cells + 1)):
+                pay[index, count] = paytable[count]
+
+        return {
+            'cum': np.cumsum(probs / probs.sum()),
+            'pay': pay,
+            'scatter_index': scatter_index,
+            'drop_chance': self.config.get_multiplier_drop_chance(mode),
+        }
+
+    def draw_boards(self, rng, num_boards: int, mode: str = 'MODE_BASE'):
+        """Draw an (N, cols, rows) array of symbol indices"""
+        cum = self.tables[mode]['cum']
+        draws = rng.random((num_boards, self.config.cols, self.config.rows))
+        boards = np.searchsorted(cum, draws, side='right')
+        return np.minimum(boards, cum.size - 1).astype(np.int8)
+
+    def draw_multiplier_sums(self, rng, num_boards: int, mode: str = 'MODE_BASE'):
+        """Sum of multiplier values dropped on each of N boards"""
+        drop_chance = self.tables[mode]['drop_chance']
+        drops = rng.random((num_boards, self.cells)) < drop_chance
+        board_ids = np.nonzero(drops)[0]
+        if board_ids.size == 0:
+            return np.zeros(num_boards, dtype=np.float64)
+
+        picks = np.searchsorted(self.mult_cum, rng.random(board_ids.size), side='right')
+        values = self.mult_values[np.minimum(picks, self.mult_values.size - 1)]
+        return np.bincount(board_ids, weights=values, minlength=num_boards)
+
+    def evaluate_boards(self, boards, mode: str = 'MODE_BASE'):
+        """
+        Return (base_win, scatter_count) arrays for a batch of boards.
+        base_win is the symbol pays plus the scatter pay, before multipliers.
+        """
+        table = self.tables[mode]
+        num_boards = boards.shape[0]
+        num_symbols = table['pay'].shape[0]
+
+        flat = boards.reshape(num_boards, -1).astype(np.int64)
+        flat += (np.arange(num_boards, dtype=np.int64) * num_symbols)[:, None]
+        counts = np.bincount(flat.ravel(), minlength=num_boards * num_symbols)
+        counts = counts.reshape(num_boards, num_symbols)
+
+        base_win = table['pay'][np.arange(num_symbols), counts].sum(axis=1)
+        if table['scatter_index'] >= 0:
+            scatter_count = counts[:, table['scatter_index']]
+        else:
+            scatter_count = np.zeros(num_boards, dtype=np.int64)
+
+        return base_win, scatter_count
+
+    @staticmethod
+    def apply_multipliers(base_win, total_multiplier):
+        """Multipliers only apply to winning boards (calculate_total_payout)"""
+        return np.where((base_win > 0) & (total_multiplier > 0), base_win * total_multiplier, base_win)
+
+    def run_freespins(self, rng, awarded, limits=None):
+        """
+        Play free spin sequences for every entry of `awarded` in lock-step.
+        A sequence ends early once its total reaches its entry of `limits`
+        (the room left under the max win, see cap_room), and is clipped to it.
+        Returns (total_win, spins_played) arrays.
+        """
+        num_sequences = awarded.size
+        remaining = awarded.astype(np.int64)
+        totals = np.zeros(num_sequences, dtype=np.float64)
+        accumulated = np.zeros(num_sequences, dtype=np.float64)
+        spins = np.zeros(num_sequences, dtype=np.int64)
+
+        needed = self.config.scatters_needed_for_trigger
+        retrigger = self.config.freespin_retrigger_amount
+
+        active = np.nonzero(remaining > 0)[0]
+        while active.size:
+            boards = self.draw_boards(rng, active.size, 'MODE_FREESPIN')
+            base_win, scatter_count = self.evaluate_boards(boards, 'MODE_FREESPIN')
+            mult_sum = self.draw_multiplier_sums(rng, active.size, 'MODE_FREESPIN')
+
+            # New drops join the persistent pool and also count as this spin's drops
+            accumulated[active] += mult_sum
+            totals[active] += self.apply_multipliers(base_win, accumulated[active] + mult_sum)
+
+            remaining[active] += np.where(scatter_count >= needed, retrigger, 0)
+            remaining[active] -= 1
+            if limits is not None:
+                capped = active[totals[active] >= limits[active]]
+                totals[capped] = limits[capped]
+                remaining[capped] = 0
+            spins[active] += 1
+            active = active[remaining[active] > 0]
+
+        return totals, spins
+
+    def run_batch(self, rng, num_spins: int) -> BatchResult:
+        """
+        Simulate one batch of base game spins including triggered free spins.
+        A triggered round pays its base spin win plus the free spin total.
+        """
+        boards = self.draw_boards(rng, num_spins, 'MODE_BASE')
+        base_win, scatter_count = self.evaluate_boards(boards, 'MODE_BASE')
+        mult_sum = self.draw_multiplier_sums(rng, num_spins, 'MODE_BASE')
+        base_payouts = self.apply_multipliers(base_win, mult_sum)
+        max_win = self.config.max_win
+        if max_win is not None:
+            base_payouts = np.minimum(base_payouts, cap_room(max_win, 0.0))
+
+        payouts = base_payouts.copy()
+        triggered = scatter_count >= self.config.scatters_needed_for_trigger
+        if max_win is not None:
+            # The round ends at the max win, before any free spins
+            triggered &= base_payouts < cap_room(max_win, 0.0)
+        played = np.zeros(num_spins, dtype=np.int64)
+
+        trigger_ids = np.nonzero(triggered)[0]
+        if trigger_ids.size:
+            limits = cap_room(max_win, base_payouts[trigger_ids])
+            fs_totals, fs_spins = self.run_freespins(rng, self.fs_awards[scatter_count[trigger_ids]], limits)
+            payouts[trigger_ids] += fs_totals
+            if limits is not None:
+                # Capped rounds pay exactly the max win
+                payouts[trigger_ids[fs_totals >= limits]] = max_win
+            played[trigger_ids] = fs_spins
+
+        return BatchResult(payouts, base_payouts, triggered, played)
+
+    def run(self, num_spins: int, seed: int = 0, batch_size: int = 100_000) -> BatchResult:
+        """Simulate `num_spins` base game spins in batches of `batch_size`"""
+        rng = np.random.default_rng(seed)
+        results = []
+        done = 0
+        while done < num_spins:
+            size = min(batch_size, num_spins - done)
+            results.append(self.run_batch(rng, size))
+            done += size
+
+        if not results:
+            empty = np.zeros(0)
+            return BatchResult(empty, empty, empty.astype(bool), empty.astype(np.int64))
+
+        return BatchResult(
+            np.concatenate([r.payouts for r in results]),
+            np.concatenate([r.base_payouts for r in results]),
+            np.concatenate([r.freespins_triggered for r in results]),
+            np.concatenate([r.freespins_played for r in results]),
+        )
+
+
+def compare_with_scalar(config, num_spins: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    Cross-check the batch engine against GameState.run_spin.
+    Both paths simulate `num_spins` spins; returns RTP, hit rate and the
+    RTP difference expressed in standard errors.
+    """
+    from gamestate import GameState
+
+    gamestate = GameState(config)
+    scalar = np.array(
+        [gamestate.run_spin(seed + sim)['payoutMultiplier'] for sim in range(num_spins)],
+        dtype=np.float64,
+    )
+    scalar_result = BatchResult(scalar, scalar, scalar > 0, np.zeros(num_spins, dtype=np.int64))
+    batch_result = BatchSpinEngine(config).run(num_spins, seed=seed)
+
+    combined_error = np.hypot(scalar_result.std_error, batch_result.std_error)
+    return {
+        'scalar_rtp': scalar_result.rtp,
+        'batch_rtp': batch_result.rtp,
+        'scalar_hit_rate': scalar_result.hit_rate,
+        'batch_hit_rate': batch_result.hit_rate,
+        'rtp_diff_sigma': float((batch_result.rtp - scalar_result.rtp) / combined_error) if combined_error else 0.0,
+    }
@@ -0,0 +1,62 @@
+"""
+Gates of Olympus - Board
+Compact integer-coded grid used throughout the spin pipeline
+"""
+
+from typing import Dict, List
+
+
+class Board:
+    """
+    Grid of symbol codes stored as a flat, immutable bytes buffer.
+
+    Cells are column-major: cell = col * rows + row, matching the order the
+    board is drawn and the order positions are reported in. Symbol name
+    strings are only produced by to_strings(), when the board is serialized.
+    """
+
+    __slots__ = ('cells', 'cols', 'rows', 'names')
+
+    def __init__(self, cells: bytes, cols: int, rows: int, names: List[str]):
+        self.cells = cells
+        self.cols = cols
+        self.rows = rows
+        self.names = names
+
+    def count(self, code: int) -> int:
+        """Number of cells holding the given symbol code"""
+        return self.cells.count(code)
+
+    def first_index(self, code: int) -> int:
+        """Flat index of the first cell holding the code, -1 if absent"""
+        return self.cells.find(code)
+
+    def positions(self, code: int) -> List[Dict[str, int]]:
+        """Row/col positions of every cell holding the given code"""
+        rows = self.rows
+        return [
+            {'row': index % rows, 'col': index // rows}
+            for index, cell in enumerate(self.cells)
+            if cell == code
+        ]
+
+    def to_strings(self) -> List[List[str]]:
+        """Expand to the Stake board format: a list of columns of symbol names"""
+        names = self.names
+        rows = self.rows
+        cells = self.cells
+        return [
+            [names[code] for code in cells[start:start + rows]]
+            for start in range(0, len(cells), rows)
+        ]
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Board):
+            return NotImplemented
+        return self.cells == other.cells and self.rows == other.rows
+
+    def __hash__(self) -> int:
+        return hash((self.cells, self.rows))
+
+    def __repr__(self) -> str:
+        return f"Board({self.to_strings()!r})"
@@ -0,0 +1,175 @@
+"""
+Gates of Olympus - Book Compactor
+Keeps a few representative books per payout and folds the rest of the
+weight into them, preserving RTP
+"""
+
+import math
+import os
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from book_index import book_line_id, build_book_index
+from book_writer import open_books_for_writing, read_book_lines
+from lookup_optimizer import LookupRow, read_lookup_table, write_lookup_table, weighted_rtp
+
+# Bucket compaction scales the lookup weights to sum to about this, so
+# integer rounding of the folded weights moves RTP by well under 1e-6 points
+BUCKET_TOTAL_WEIGHT = 10 ** 12
+
+
+class BookCompactor:
+    """
+    Deduplicates books that share a payout.
+
+    Rows are grouped by exact payout, or by payout bucket when bucket_edges
+    is given (zero payouts always form their own group). Each group keeps
+    its first keep_per_group books by id and the group's whole lookup
+    weight is folded into them:
+
+    - exact payout groups split the weight evenly, so RTP is unchanged
+      exactly;
+    - bucket groups always keep their lowest and highest payout books
+      (keep_per_group >= 2) and preserve the group's weight and
+      weight x payout totals: the other books get an even share (less if
+      they would pull the mean out of reach) and the lowest / highest
+      books solve for the rest. Weights are first scaled to sum to about
+      BUCKET_TOTAL_WEIGHT, so RTP only moves by integer rounding.
+
+    compact() refuses to rewrite anything if RTP would move by more than
+    rtp_tolerance percentage points. RTP is reported in percent of the
+    mode cost.
+    """
+
+    def __init__(self, books_path: Path, lookup_path: Path, keep_per_group: int = 10,
+                 bucket_edges: Optional[List[float]] = None, rtp_tolerance: float = 1e-6,
+                 cost: float = 1.0):
+        if keep_per_group < 1:
+            raise ValueError("keep_per_group must be at least 1")
+        if bucket_edges and keep_per_group < 2:
+            raise ValueError("Bucket compaction needs keep_per_group >= 2 "
+                             "(the lowest and highest payout books of each bucket)")
+
+        self.books_path = Path(books_path)
+        self.lookup_path = Path(lookup_path)
+        self.keep_per_group = keep_per_group
+        self.bucket_edges = sorted(bucket_edges) if bucket_edges else None
+        self.rtp_tolerance = rtp_tolerance
+        self.cost = cost
+
+    def _group_key(self, row: LookupRow) -> Any:
+        if self.bucket_edges is None or row.payout == 0:
+            return row.payout_text
+        return ('bucket', bisect_right(self.bucket_edges, row.payout))
+
+    def select(self, rows: List[LookupRow]) -> List[LookupRow]:
+        """Pick representatives and fold each group's weight into them"""
+        if self.bucket_edges is not None:
+            scale = max(1, BUCKET_TOTAL_WEIGHT // max(1, sum(row.weight for row in rows)))
+            for row in rows:
+                row.weight *= scale
+
+        groups: Dict[Any, List[LookupRow]] = {}
+        for row in rows:
+            groups.setdefault(self._group_key(row), []).append(row)
+
+        kept = []
+        for members in groups.values():
+            members.sort(key=lambda row: row.sim_id)
+            reps = self._representatives(members)
+            if len(reps) == len(members):
+                kept.extend(members)
+                continue
+            total_weight = sum(row.weight for row in members)
+            total_paid = sum(row.weight * row.payout for row in members)
+
+            share, extra = divmod(total_weight, len(reps))
+            for index, rep in enumerate(reps):
+                rep.weight = share + (1 if index < extra else 0)
+
+            if self.bucket_edges is not None:
+                self._match_group_payout(reps, total_weight, total_paid)
+            kept.extend(reps)
+
+        kept.sort(key=lambda row: row.sim_id)
+        return kept
+
+    def _representatives(self, members: List[LookupRow]) -> List[LookupRow]:
+        """
+        First keep_per_group members by id. Bucket groups always include
+        their lowest and highest payout, so the group mean stays reachable.
+        """
+        if self.bucket_edges is None or len(members) <= self.keep_per_group:
+            return members[:self.keep_per_group]
+
+        low = min(members, key=lambda row: row.payout)
+        high = max(members, key=lambda row: row.payout)
+        reps = [low] if low is high else [low, high]
+        for row in members:
+            if len(reps) >= self.keep_per_group:
+                break
+            if row is not low and row is not high:
+                reps.append(row)
+        return reps[:self.keep_per_group]
+
+    @staticmethod
+    def _match_group_payout(reps: List[LookupRow], total_weight: int, total_paid: float) -> None:
+        """
+        Weights with the group's sum(w) and sum(w * payout): the middle reps
+        keep their share unless the lowest / highest rep could then not
+        restore the group mean, in which case they get the largest weight
+        that still can; the lowest and highest reps take the rest.
+        """
+        low = min(reps, key=lambda row: row.payout)
+        high = max(reps, key=lambda row: row.payout)
+        spread = high.payout - low.payout
+        if spread <= 0:
+            return
+
+        middle = [row for row in reps if row is not low and row is not high]
+        if middle:
+            # Residual mean (P - m * sum p) / (W - m * k) must stay in [low, high]
+            weight = middle[0].weight
+            count = len(middle)
+            paid = sum(row.payout for row in middle)
+            for room, pull in ((total_paid - low.payout * total_weight, paid - low.payout * count),
+                               (high.payout * total_weight - total_paid, high.payout * count - paid)):
+                if pull > 0:
+                    weight = min(weight, math.floor(room / pull))
+            for row in middle:
+                row.weight = max(1, weight)
+
+        rest_weight = total_weight - sum(row.weight for row in middle)
+        rest_paid = total_paid - sum(row.weight * row.payout for row in middle)
+        # Keep both representatives reachable (weight >= 1)
+        high.weight = max(1, min(rest_weight - 1, round((rest_paid - low.payout * rest_weight) / spread)))
+        low.weight = rest_weight - high.weight
+
+    def compact(self) -> Dict[str, Any]:
+        """Rewrite the books and lookup table keeping only representatives"""
+        rows = read_lookup_table(self.lookup_path)
+        rtp_before = weighted_rtp(rows, self.cost)
+        kept = self.select(rows)
+        rtp_after = weighted_rtp(kept, self.cost)
+        if not math.isclose(rtp_after, rtp_before, rel_tol=0, abs_tol=self.rtp_tolerance):
+            raise ValueError(f"Compaction would move RTP from {rtp_before:.10f}% to {rtp_after:.10f}%; "
+                             f"keep more books per group")
+        kept_ids = {row.sim_id for row in kept}
+
+        temp_path = self.books_path.with_name('.compact_' + self.books_path.name)
+        with open_books_for_writing(temp_path) as out:
+            for line in read_book_lines(self.books_path):
+                if book_line_id(line) in kept_ids:
+                    out.write(line)
+        os.replace(temp_path, self.books_path)
+        if self.books_path.suffix != '.zst':
+            build_book_index(self.books_path)
+        write_lookup_table(self.lookup_path, kept)
+
+        return {
+            'books_before': len(rows),
+            'books_after': len(kept),
+            'rtp_before': rtp_before,
+            'rtp_after': rtp_after,
+        }
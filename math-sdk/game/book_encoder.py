@@ -0,0 +1,48 @@
+"""
+Gates of Olympus - Book Encoder
+Fast JSON encoding of Stake books
+"""
+
+import json
+from typing import Dict
+
+from board import Board
+from event_recorder import EventRecorder
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, only used for compact output
+    orjson = None
+
+
+def encode_default(value):
+    """Expand compact in-memory objects (boards, event logs) while serializing"""
+    if isinstance(value, Board):
+        return value.to_strings()
+    if isinstance(value, EventRecorder):
+        return value.to_stake()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class BookEncoder:
+    """
+    Encodes books into JSONL lines.
+
+    The default (spaced) output is byte-identical to json.dumps, but the
+    C encoder is built once instead of on every json.dumps call.
+
+    compact=True drops the spaces after separators and uses orjson when it
+    is installed (same data, smaller files, several times faster).
+    """
+
+    def __init__(self, compact: bool = False):
+        self.compact = compact
+        separators = (',', ':') if compact else (', ', ': ')
+        self._dumps = json.JSONEncoder(separators=separators, default=encode_default).encode
+        self._use_orjson = compact and orjson is not None
+
+    def encode(self, book: Dict) -> str:
+        """Encode one book as a JSONL line (with trailing newline)"""
+        if self._use_orjson:
+            return orjson.dumps(book, default=encode_default).decode() + '\n'
+        return self._dumps(book) + '\n'
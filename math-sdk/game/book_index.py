@@ -0,0 +1,101 @@
+"""
+Gates of Olympus - Book Index
+Sim id -> byte offset index for books_{mode}.jsonl
+"""
+
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+MISSING = 2 ** 64 - 1  # Offset of ids that are not in the books file (e.g. compacted away)
+
+
+def index_path_for(books_path: Path) -> Path:
+    """books_{mode}.jsonl -> books_{mode}.index"""
+    books_path = Path(books_path)
+    return books_path.with_name(books_path.name.split('.')[0] + '.index')
+
+
+def book_line_id(line: str) -> int:
+    """Book id of an encoded book line without parsing the whole line"""
+    if line.startswith('{"id": '):
+        return int(line[7:line.index(',', 7)])
+    if line.startswith('{"id":'):
+        return int(line[6:line.index(',', 6)])
+    return json.loads(line)['id']
+
+
+def line_size(line: str) -> int:
+    """Encoded size of a books line in bytes"""
+    return len(line) if line.isascii() else len(line.encode('utf-8'))
+
+
+class BookIndex:
+    """
+    Byte offsets of books by id, stored as a flat array of uint64 with
+    entry id - 1 holding the offset of book `id` (MISSING if absent).
+    Only uncompressed books files are indexed: a .zst stream cannot be
+    entered at an arbitrary offset.
+    """
+
+    def __init__(self, offsets: Optional[array] = None):
+        self.offsets = offsets if offsets is not None else array('Q')
+
+    @classmethod
+    def load(cls, path: Path) -> 'BookIndex':
+        offsets = array('Q')
+        with open(path, 'rb') as f:
+            offsets.frombytes(f.read())
+        return cls(offsets)
+
+    def save(self, path: Path) -> None:
+        with open(path, 'wb') as f:
+            self.offsets.tofile(f)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def offset(self, book_id: int) -> Optional[int]:
+        """Byte offset of a book, or None if it is not in the file"""
+        if not 1 <= book_id <= len(self.offsets):
+            return None
+        offset = self.offsets[book_id - 1]
+        return None if offset == MISSING else offset
+
+    def add(self, book_id: int, offset: int) -> None:
+        """Record a book; ids may arrive with gaps but must increase"""
+        if book_id <= len(self.offsets):
+            raise ValueError(f"Book ids must increase (got {book_id} after {len(self.offsets)})")
+        self.offsets.extend([MISSING] * (book_id - 1 - len(self.offsets)))
+        self.offsets.append(offset)
+
+
+def build_book_index(books_path: Path) -> BookIndex:
+    """Scan an uncompressed books file and write its index next to it"""
+    index = BookIndex()
+    offset = 0
+    with open(books_path, 'rb') as f:
+        for raw in f:
+            if raw.strip():
+                index.add(book_line_id(raw.decode('utf-8')), offset)
+            offset += len(raw)
+    index.save(index_path_for(books_path))
+    return index
+
+
+def read_book_at(books_path: Path, book_id: int, index: Optional[BookIndex] = None) -> Optional[Dict]:
+    """Fetch one book by id with a single seek, or None if it is not in the file"""
+    if index is None:
+        index = BookIndex.load(index_path_for(books_path))
+    offset = index.offset(book_id)
+    if offset is None:
+        return None
+
+    with open(books_path, 'rb') as f:
+        f.seek(offset)
+        book = json.loads(f.readline())
+    if book['id'] != book_id:
+        raise ValueError(f"Index of {books_path} is stale: offset {offset} holds book {book['id']}, "
+                         f"not {book_id}")
+    return book
@@ -0,0 +1,237 @@
+"""
+Gates of Olympus - Book Writer
+Streams books and lookup table rows to disk as they are produced
+Books can optionally be zstd-compressed (books_{mode}.jsonl.zst)
+"""
+
+import io
+import json
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from book_encoder import BookEncoder
+from book_index import index_path_for, line_size
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, only needed for compressed books
+    zstandard = None
+
+
+ENCODERS = {False: BookEncoder(compact=False), True: BookEncoder(compact=True)}
+
+
+def books_filename(mode: str, compression: bool = False) -> str:
+    """Name of the books file BookWriter writes for a mode"""
+    return f"books_{mode}.jsonl.zst" if compression else f"books_{mode}.jsonl"
+
+
+def lookup_filename(mode: str) -> str:
+    """Name of the lookup table BookWriter writes for a mode"""
+    return f"lookUpTable_{mode}.csv"
+
+
+def encode_book(book: Dict, compact: bool = False) -> str:
+    """Serialize one book as a JSONL line"""
+    return ENCODERS[compact].encode(book)
+
+
+def encode_lookup_entry(entry: Dict) -> str:
+    """Serialize one lookup table row as a CSV line"""
+    return f"{entry['simulation_number']},{entry['weight']},{entry['payout']}\n"
+
+
+def require_zstandard() -> None:
+    """Raise a helpful error when compression is requested without zstandard"""
+    if zstandard is None:
+        raise ImportError("Compressed books require zstandard (pip install zstandard)")
+
+
+def open_truncated(path: Path, offset: Optional[int] = None):
+    """
+    Open a file for binary writing. With an offset, the existing file is
+    cut back to `offset` bytes and writing continues from there (resume).
+    """
+    if offset is None:
+        return open(path, 'wb')
+    raw = open(path, 'r+b')
+    raw.truncate(offset)
+    raw.seek(offset)
+    return raw
+
+
+def open_books_for_writing(path: Path, compression_level: int = 9, compression_threads: int = 0,
+                           offset: Optional[int] = None):
+    """
+    Open a books file for text writing; .zst paths get a streaming zstd
+    compressor. Closing the returned stream ends the frame and the file.
+    A resumed .zst file must be cut at a frame boundary (see checkpoint).
+    """
+    path = Path(path)
+    if path.suffix == '.zst':
+        require_zstandard()
+        compressor = zstandard.ZstdCompressor(level=compression_level, threads=compression_threads)
+        return io.TextIOWrapper(compressor.stream_writer(open_truncated(path, offset)), encoding='utf-8')
+    return io.TextIOWrapper(open_truncated(path, offset), encoding='utf-8')
+
+
+def read_book_lines(path: Path) -> Iterator[str]:
+    """
+    Stream raw JSONL lines from a .jsonl or .jsonl.zst books file.
+    Compressed files are decompressed incrementally, never fully in memory.
+    """
+    path = Path(path)
+    with open(path, 'rb') as raw:
+        if path.suffix == '.zst':
+            require_zstandard()
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        else:
+            stream = raw
+
+        with io.TextIOWrapper(stream, encoding='utf-8') as text:
+            for line in text:
+                if line.strip():
+                    yield line
+
+
+def read_books(path: Path) -> Iterator[Dict]:
+    """Stream books back from a .jsonl or .jsonl.zst file, one dict at a time"""
+    for line in read_book_lines(path):
+        yield json.loads(line)
+
+
+class BookWriter:
+    """
+    Writes books_{mode}.jsonl and lookUpTable_{mode}.csv incrementally.
+    Only running totals are kept in memory, so peak memory does not grow
+    with the number of sims.
+
+    With compression enabled, books go to books_{mode}.jsonl.zst (the file
+    referenced by index.json) through a streaming zstd compressor.
+    compression_threads follows zstandard: 0 = single-threaded,
+    -1 = one worker per CPU core.
+
+    Encoded lines are collected and written in batches of buffer_books,
+    so the file layer sees a few large writes instead of one per book.
+    compact=True writes books without spaces after separators.
+
+    Uncompressed books also get books_{mode}.index (see BookIndex): books
+    are written in id order from 1, so entry i is the offset of the i-th
+    book written.
+
+    checkpoint() makes everything written so far durable and returns the
+    totals and file offsets; passing that dict back as `resume` truncates
+    both files to those offsets and continues after the last saved book.
+    """
+
+    def __init__(self, library_path: Path, mode: str, compression: bool = False,
+                 compression_level: int = 9, compression_threads: int = 0,
+                 compact: bool = False, buffer_books: int = 1000,
+                 resume: Optional[Dict] = None):
+        self.library_path = Path(library_path)
+        self.mode = mode
+        self.compression = compression
+        self.compact = compact
+        self.buffer_books = buffer_books
+        self._book_lines = []
+        self._lookup_lines = []
+        self.books_path = self.library_path / books_filename(mode, compression)
+        self.lookup_path = self.library_path / lookup_filename(mode)
+
+        self.num_books = resume['num_books'] if resume else 0
+        self.total_payout = resume['total_payout'] if resume else 0.0
+        books_offset = resume['books_offset'] if resume else None
+        lookup_offset = resume['lookup_offset'] if resume else None
+        self._books_base = books_offset or 0
+        self._position = self._books_base
+        self._index_offsets = array('Q')
+
+        self.library_path.mkdir(parents=True, exist_ok=True)
+
+        self._books_file = open_books_for_writing(self.books_path, compression_level, compression_threads,
+                                                  books_offset)
+        self._lookup_file = io.TextIOWrapper(open_truncated(self.lookup_path, lookup_offset), encoding='utf-8')
+
+        self.index_path = None if compression else index_path_for(self.books_path)
+        self._index_file = None
+        if self.index_path:
+            index_offset = self.num_books * self._index_offsets.itemsize if resume else None
+            self._index_file = open_truncated(self.index_path, index_offset)
+
+    def write(self, book: Dict, lookup_entry: Dict) -> None:
+        """Write one book and its lookup row"""
+        line = encode_book(book, self.compact)
+        self._book_lines.append(line)
+        if self._index_file:
+            self._index_offsets.append(self._position)
+            self._position += line_size(line)
+        self._lookup_lines.append(encode_lookup_entry(lookup_entry))
+        self.num_books += 1
+        self.total_payout += lookup_entry['payout']
+        if len(self._book_lines) >= self.buffer_books:
+            self.flush()
+
+    def write_encoded(self, books_text: str, lookup_text: str, payouts: List[float]) -> None:
+        """Write a pre-encoded block of books and lookup rows (from a worker shard)"""
+        self.flush()
+        if self._index_file:
+            for line in books_text.splitlines(True):
+                self._index_offsets.append(self._position)
+                self._position += line_size(line)
+            self._flush_index()
+        self._books_file.write(books_text)
+        self._lookup_file.write(lookup_text)
+        self.num_books += len(payouts)
+        for payout in payouts:
+            self.total_payout += payout
+
+    def flush(self) -> None:
+        """Write out buffered lines"""
+        if self._book_lines:
+            self._books_file.write(''.join(self._book_lines))
+            self._lookup_file.write(''.join(self._lookup_lines))
+            self._book_lines.clear()
+            self._lookup_lines.clear()
+        self._flush_index()
+
+    def _flush_index(self) -> None:
+        if self._index_offsets:
+            self._index_offsets.tofile(self._index_file)
+            del self._index_offsets[:]
+
+    def checkpoint(self) -> Dict:
+        """
+        Flush everything written so far to the OS and return the state needed
+        to resume here. Compressed books end a zstd frame, so the file can be
+        cut at the returned offset and continued with a new frame.
+        """
+        self.flush()
+        self._books_file.flush()
+        self._lookup_file.flush()
+        if self._index_file:
+            self._index_file.flush()
+        if self.compression:
+            self._books_file.buffer.flush(zstandard.FLUSH_FRAME)
+            books_offset = self._books_base + self._books_file.buffer.tell()
+        else:
+            books_offset = self._books_file.buffer.tell()
+        return {
+            'num_books': self.num_books,
+            'total_payout': self.total_payout,
+            'books_offset': books_offset,
+            'lookup_offset': self._lookup_file.buffer.tell(),
+        }
+
+    def close(self) -> None:
+        self.flush()
+        self._books_file.close()
+        self._lookup_file.close()
+        if self._index_file:
+            self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
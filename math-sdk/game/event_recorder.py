@@ -0,0 +1,136 @@
+"""
+Gates of Olympus - Event Recorder
+Compact per-book event log, expanded to Stake event dicts only when the
+book is serialized
+"""
+
+from typing import Dict, Iterator, List
+
+# Record kinds; a record is a tuple (kind, *payload)
+REVEAL = 0
+MULTIPLIER_DROP = 1
+WIN_INFO = 2
+SCATTER_WIN = 3
+FREESPIN_TRIGGER = 4
+FREESPIN_UPDATE = 5
+FREESPIN_END = 6
+SET_WIN = 7
+SET_TOTAL_WIN = 8
+FINAL_WIN = 9
+TUMBLE = 10
+WINCAP = 11
+
+AMOUNT_TYPES = {
+    FREESPIN_END: 'endFreeSpin',
+    SET_WIN: 'setWin',
+    SET_TOTAL_WIN: 'setTotalWin',
+    FINAL_WIN: 'finalWin',
+    WINCAP: 'wincap',
+}
+
+
+class EventRecorder:
+    """
+    Events of one book as (kind, *payload) tuples.
+
+    Payloads hold only immutable values: boards are immutable Board
+    objects and multiplier / win lists are copied into tuples, so later
+    changes to the game state never leak into recorded events. Win
+    positions and event indices are produced by to_stake(), which the
+    book encoder calls while serializing.
+    """
+
+    __slots__ = ('records',)
+
+    def __init__(self):
+        self.records = []
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self.to_stake())
+
+    def reveal(self, board, game_type: str) -> None:
+        self.records.append((REVEAL, board, game_type))
+
+    def multiplier_drop(self, multipliers) -> None:
+        """multipliers: (row, col, value) tuples"""
+        self.records.append((MULTIPLIER_DROP, tuple(multipliers)))
+
+    def win_info(self, wins, board) -> None:
+        """wins: SymbolWin records, positions are taken from board later"""
+        self.records.append((WIN_INFO, tuple(wins), board))
+
+    def tumble(self, removed, new_symbols, board) -> None:
+        """removed: exploded cell indices, new_symbols: bytes of new codes per column"""
+        self.records.append((TUMBLE, tuple(removed), tuple(new_symbols), board))
+
+    def scatter_win(self, count: int, payout: float) -> None:
+        self.records.append((SCATTER_WIN, count, payout))
+
+    def freespin_trigger(self, total_fs: int) -> None:
+        self.records.append((FREESPIN_TRIGGER, total_fs))
+
+    def freespin_update(self, amount: int, total: int) -> None:
+        self.records.append((FREESPIN_UPDATE, amount, total))
+
+    def amount(self, kind: int, amount: float) -> None:
+        """endFreeSpin, setWin, setTotalWin, finalWin or wincap"""
+        self.records.append((kind, amount))
+
+    def to_stake(self) -> List[Dict]:
+        """Expand to Stake Engine event dicts"""
+        events = []
+        for index, record in enumerate(self.records):
+            kind = record[0]
+            if kind == REVEAL:
+                event = {'index': index, 'type': 'reveal', 'board': record[1], 'gameType': record[2]}
+            elif kind == MULTIPLIER_DROP:
+                event = {
+                    'index': index,
+                    'type': 'multiplierDrop',
+                    'multipliers': [
+                        {'position': {'row': row, 'col': col}, 'value': value}
+                        for row, col, value in record[1]
+                    ],
+                }
+            elif kind == WIN_INFO:
+                wins, board = record[1], record[2]
+                event = {
+                    'index': index,
+                    'type': 'winInfo',
+                    'totalWin': sum(win.payout for win in wins),
+                    'wins': [win.to_dict(board) for win in wins],
+                }
+            elif kind == TUMBLE:
+                removed, new_symbols, board = record[1], record[2], record[3]
+                rows, names = board.rows, board.names
+                event = {
+                    'index': index,
+                    'type': 'tumbleBoard',
+                    'explodingSymbols': [{'row': cell % rows, 'col': cell // rows} for cell in removed],
+                    'newSymbols': [[names[code] for code in column] for column in new_symbols],
+                }
+            elif kind == SCATTER_WIN:
+                event = {'index': index, 'type': 'scatterWin', 'count': record[1], 'payout': record[2]}
+            elif kind == FREESPIN_TRIGGER:
+                event = {'index': index, 'type': 'freespinTrigger', 'totalFs': record[1]}
+            elif kind == FREESPIN_UPDATE:
+                event = {'index': index, 'type': 'updateFreeSpin', 'amount': record[1], 'total': record[2]}
+            else:
+                event = {'index': index, 'type': AMOUNT_TYPES[kind], 'amount': record[1]}
+            events.append(event)
+        return events
+
+
+class NullRecorder(EventRecorder):
+    """Payout-only runs: every event is dropped on the floor"""
+
+    __slots__ = ()
+
+    def _drop(self, *args) -> None:
+        pass
+
+    reveal = multiplier_drop = win_info = tumble = scatter_win = _drop
+    freespin_trigger = freespin_update = amount = _drop
@@ -0,0 +1,199 @@
+"""
+Gates of Olympus - Exact RTP Calculator
+Analytic RTP, hit rate and per-symbol contribution straight from GameConfig
+No simulation involved
+"""
+
+from math import comb, factorial
+from typing import Dict, List, Any
+
+
+class ExactCalculator:
+    """
+    Computes the exact expected payout of one base game spin. A trigger
+    round pays its base spin win plus the free spins, as in GameState.
+
+    Every cell is drawn independently from the mode's symbol weights, so the
+    count of each symbol is binomial and, by linearity, the expected
+    pay-anywhere win is a sum of per-symbol binomial expectations.
+    Multiplier drops are independent of the symbols, so their effect
+    factors out as E[M if M > 0 else 1].
+
+    Free spins are handled with a Markov chain on the number of spins
+    remaining: a spin exists independently of its own board, so the
+    sequence value is E[board win] * sum_t P(spin t is played) * E[mult_t].
+
+    The hit rate is computed over the joint (multinomial) symbol counts with
+    a polynomial dynamic program, and counts a spin as a hit when it has a
+    symbol win, a scatter win or a free spin trigger.
+
+    The max win cap (config.max_win) is not modelled: the figures are those
+    of the uncapped game, an upper bound on the capped RTP.
+    """
+
+    def __init__(self, config, tolerance: float = 1e-15, max_freespins: int = 100_000):
+        if config.tumble_enabled:
+            raise ValueError("ExactCalculator models static boards; disable tumble_enabled or simulate")
+        self.config = config
+        self.cells = config.cols * config.rows
+        self.tolerance = tolerance
+        self.max_freespins = max_freespins
+        self.paytable = {symbol.value: table for symbol, table in config.paytable.items()}
+
+    def symbol_pay(self, name: str, count: int) -> float:
+        """Pay for `count` copies of a symbol, following GameCalculations"""
+        table = self.paytable.get(name, [])
+        min_count = 4 if name == 'scatter' else 8
+        if count >= min_count and count < len(table):
+            return table[count]
+        return 0.0
+
+    def symbol_probabilities(self, mode: str) -> Dict[str, float]:
+        """Per-cell draw probability of every symbol"""
+        weights = self.config.get_symbol_weights(mode)
+        total = float(sum(weights.values()))
+        return {symbol.value: weight / total for symbol, weight in weights.items()}
+
+    def count_distribution(self, p: float) -> List[float]:
+        """Binomial distribution of a symbol count over the board"""
+        n = self.cells
+        return [comb(n, c) * p ** c * (1 - p) ** (n - c) for c in range(n + 1)]
+
+    def expected_symbol_pays(self, mode: str) -> Dict[str, float]:
+        """Expected pay of every symbol on one board, before multipliers"""
+        return {
+            name: sum(prob * self.symbol_pay(name, count)
+                      for count, prob in enumerate(self.count_distribution(p)))
+            for name, p in self.symbol_probabilities(mode).items()
+        }
+
+    def multiplier_moments(self, mode: str) -> Dict[str, float]:
+        """Expected multiplier sum per board and chance that nothing drops"""
+        weights = self.config.multiplier_weights
+        total = float(sum(weights.values()))
+        mean_value = sum(value * weight for value, weight in weights.items()) / total
+        drop_chance = self.config.get_multiplier_drop_chance(mode)
+        return {
+            'mean_sum': self.cells * drop_chance * mean_value,
+            'p_none': (1 - drop_chance) ** self.cells,
+        }
+
+    def no_hit_probability(self, mode: str) -> float:
+        """
+        Probability that a board has no symbol win, no scatter win and no
+        trigger. Multiplies per-symbol generating polynomials
+        sum_c p^c / c! x^c over the allowed counts; n! * [x^n] is the answer.
+        """
+        n = self.cells
+        needed = self.config.scatters_needed_for_trigger
+        poly = [1.0] + [0.0] * n
+
+        for name, p in self.symbol_probabilities(mode).items():
+            allowed = [
+                count for count in range(n + 1)
+                if self.symbol_pay(name, count) == 0
+                and not (name == 'scatter' and count >= needed)
+            ]
+            terms = {count: p ** count / factorial(count) for count in allowed}
+            product = [0.0] * (n + 1)
+            for degree, coef in enumerate(poly):
+                if coef == 0.0:
+                    continue
+                for count, term in terms.items():
+                    if degree + count <= n:
+                        product[degree + count] += coef * term
+            poly = product
+
+        return factorial(n) * poly[n]
+
+    def freespin_survival(self, awarded: int) -> List[float]:
+        """
+        P(spin t is played) for t = 1, 2, ... given the initial award,
+        from a Markov chain on spins remaining with retriggers.
+        """
+        retrigger = self.config.freespin_retrigger_amount
+        needed = self.config.scatters_needed_for_trigger
+        scatter_p = self.symbol_probabilities('MODE_FREESPIN').get('scatter', 0.0)
+        p_retrigger = sum(self.count_distribution(scatter_p)[needed:])
+
+        remaining = {awarded: 1.0}
+        survival = []
+        while remaining and len(survival) < self.max_freespins:
+            alive = sum(remaining.values())
+            if alive < self.tolerance:
+                break
+            survival.append(alive)
+
+            step = {}
+            for spins, prob in remaining.items():
+                for after, p in ((spins - 1, 1 - p_retrigger), (spins - 1 + retrigger, p_retrigger)):
+                    if after > 0 and p > 0:
+                        step[after] = step.get(after, 0.0) + prob * p
+            remaining = step
+
+        return survival
+
+    def freespin_factor(self, awarded: int) -> Dict[str, float]:
+        """
+        Expected multiplier-weighted spin count of a free spin sequence:
+        sum_t P(spin t played) * E[mult_t], plus the expected length.
+        On spin t the drops of spins 1..t-1 count once and this spin's twice
+        (see calculate_total_multiplier), and no drop at all means x1.
+        """
+        moments = self.multiplier_moments('MODE_FREESPIN')
+        factor = 0.0
+        length = 0.0
+        for t, alive in enumerate(self.freespin_survival(awarded), start=1):
+            expected_mult = (t + 1) * moments['mean_sum'] + moments['p_none'] ** t
+            factor += alive * expected_mult
+            length += alive
+        return {'factor': factor, 'length': length}
+
+    def bonus_buy_value(self, awarded: int) -> float:
+        """Expected payout of a bonus buy round of `awarded` free spins, in multiples of the bet"""
+        fs_pays = self.expected_symbol_pays('MODE_FREESPIN')
+        return sum(fs_pays.values()) * self.freespin_factor(awarded)['factor']
+
+    def calculate(self) -> Dict[str, Any]:
+        """Exact base game RTP, hit rate and per-symbol contribution"""
+        needed = self.config.scatters_needed_for_trigger
+
+        base_pays = self.expected_symbol_pays('MODE_BASE')
+        base_moments = self.multiplier_moments('MODE_BASE')
+        base_mult = base_moments['mean_sum'] + base_moments['p_none']
+
+        # Free spin value depends on the scatter count only through the award
+        scatter_p = self.symbol_probabilities('MODE_BASE').get('scatter', 0.0)
+        trigger_rate = 0.0
+        fs_factor = 0.0
+        fs_length = 0.0
+        sequences = {}
+        for count, prob in enumerate(self.count_distribution(scatter_p)):
+            if count < needed or prob == 0.0:
+                continue
+            awarded = self.config.freespin_triggers.get(count, 15)
+            if awarded not in sequences:
+                sequences[awarded] = self.freespin_factor(awarded)
+            trigger_rate += prob
+            fs_factor += prob * sequences[awarded]['factor']
+            fs_length += prob * sequences[awarded]['length']
+
+        fs_pays = self.expected_symbol_pays('MODE_FREESPIN')
+
+        symbol_rtp = {}
+        for name in set(base_pays) | set(fs_pays):
+            contribution = base_pays.get(name, 0.0) * base_mult + fs_pays.get(name, 0.0) * fs_factor
+            symbol_rtp[name] = contribution * 100
+
+        base_rtp = sum(base_pays.values()) * base_mult * 100
+        freespin_rtp = sum(fs_pays.values()) * fs_factor * 100
+
+        return {
+            'rtp': base_rtp + freespin_rtp,
+            'base_rtp': base_rtp,
+            'freespin_rtp': freespin_rtp,
+            'hit_rate': 1.0 - self.no_hit_probability('MODE_BASE'),
+            'freespin_trigger_rate': trigger_rate,
+            'avg_freespins': fs_length / trigger_rate if trigger_rate else 0.0,
+            'symbol_rtp': dict(sorted(symbol_rtp.items(), key=lambda item: -item[1])),
+        }
@@ -7,70 +7,83 @@ Following Stake Engine architecture
 from typing import Dict, List, Any
 
 
+class SymbolWin:
+    """One pay-anywhere symbol win; positions are read off the board on demand"""
+
+    __slots__ = ('symbol', 'count', 'payout', 'code')
+
+    def __init__(self, symbol: str, count: int, payout: float, code: int):
+        self.symbol = symbol
+        self.count = count
+        self.payout = payout
+        self.code = code
+
+    def to_dict(self, board) -> Dict[str, Any]:
+        """Stake win entry, with the positions of the symbol on `board`"""
+        return {
+            'symbol': self.symbol,
+            'count': self.count,
+            'payout': self.payout,
+            'positions': board.positions(self.code),
+        }
+
+    def __repr__(self) -> str:
+        return f"SymbolWin({self.symbol!r}, {self.count}, {self.payout})"
+
+
 class GameCalculations:
     """Handles game-specific win calculations"""
 
-    def calculate_scatter_pays(self) -> List[Dict]:
+    def calculate_scatter_pays(self) -> List[SymbolWin]:
         """
         Calculate wins based on scatter/pay-anywhere logic
         Minimum 8 symbols needed for a win
         """
-        from game.game_config import Symbol
-
-        symbol_counts = {}
-
-        # Count each symbol type
-        for col in range(len(self.grid)):
-            for row in range(len(self.grid[col])):
-                symbol = self.grid[col][row]
-
-                # Skip scatter symbol (pays separately)
-                if symbol == Symbol.SCATTER.value:
-                    continue
-
-                if symbol not in symbol_counts:
-                    symbol_counts[symbol] = {
-                        'count': 0,
-                        'positions': []
-                    }
-
-                symbol_counts[symbol]['count'] += 1
-                symbol_counts[symbol]['positions'].append({
-                    'row': row,
-                    'col': col
-                })
-
-        # Calculate payouts
-        wins = []
-        for symbol_str, data in symbol_counts.items():
-            # Find matching Symbol enum
-            symbol_enum = None
-            for s in Symbol:
-                if s.value == symbol_str:
-                    symbol_enum = s
-                    break
+        board = self.grid
+        found = []
+
+        # Count each paying symbol (scatter pays separately)
+        for code, name, paytable in self.config.paying_symbols:
+            count = board.count(code)
 
             # Check if we have enough symbols (min 8 for Gates of Olympus)
-            if symbol_enum and data['count'] >= 8:
-                paytable = self.config.paytable.get(symbol_enum, [])
-                if data['count'] < len(paytable):
-                    payout = paytable[data['count']]
-                    if payout > 0:
-                        wins.append({
-                            'symbol': symbol_str,
-                            'count': data['count'],
-                            'payout': payout,
-                            'positions': data['positions'],
-                        })
-
-        return wins
+            if count >= 8 and count < len(paytable):
+                payout = paytable[count]
+                if payout > 0:
+                    found.append((board.first_index(code), code, name, count, payout))
+
+        # Report wins in order of first appearance on the board
+        found.sort()
+        return [SymbolWin(name, count, payout, code) for _, code, name, count, payout in found]
+
+    def calculate_symbol_counts(self) -> List[int]:
+        """Count of every symbol code on the grid, in one pass"""
+        counts = [0] * len(self.config.symbol_names)
+        for code in self.grid.cells:
+            counts[code] += 1
+        return counts
+
+    def calculate_wins_from_counts(self, counts: List[int]) -> List[SymbolWin]:
+        """
+        calculate_scatter_pays from maintained symbol counts (tumbles), so
+        the board is only searched for the first cell of winning symbols
+        """
+        board = self.grid
+        found = []
+        for code, name, paytable in self.config.paying_symbols:
+            count = counts[code]
+            if count >= 8 and count < len(paytable):
+                payout = paytable[count]
+                if payout > 0:
+                    found.append((board.first_index(code), code, name, count, payout))
+
+        found.sort()
+        return [SymbolWin(name, count, payout, code) for _, code, name, count, payout in found]
 
     def calculate_scatter_payout(self, scatter_count: int) -> float:
         """Calculate scatter symbol payout"""
-        from game.game_config import Symbol
-
         if scatter_count >= 4:
-            scatter_paytable = self.config.paytable[Symbol.SCATTER]
+            scatter_paytable = self.config.scatter_paytable
             if scatter_count < len(scatter_paytable):
                 return scatter_paytable[scatter_count]
 
@@ -94,8 +107,8 @@ class GameCalculations:
                 total_multiplier += sum(self.active_multipliers)
 
             # Add new multipliers dropped this spin
-            for mult in self.multipliers:
-                total_multiplier += mult['value']
+            for _, _, value in self.multipliers:
+                total_multiplier += value
 
         return total_multiplier
 
@@ -105,7 +118,7 @@ class GameCalculations:
         Formula: (base_win + scatter_win) * bet * total_multiplier
         """
         # Calculate base win from symbol matches
-        base_win = sum(win['payout'] for win in self.wins)
+        base_win = sum(win.payout for win in self.wins)
 
         # Add scatter payout
         scatter_count = self.count_scatters()
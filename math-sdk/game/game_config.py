@@ -4,8 +4,11 @@ Converts TypeScript config to Stake Engine Math SDK format
 """
 
 from enum import Enum
+from math import comb
 from typing import Dict, List, Tuple
 
+from samplers import WeightedSampler
+
 class Symbol(Enum):
     BLUE_GEM = 'blue_gem'
     GREEN_GEM = 'green_gem'
@@ -33,6 +36,11 @@ class GameConfig:
         # RTP Configuration
         self.target_rtp = 96.0
 
+        # Max win per round, in multiples of the bet (None = uncapped).
+        # Reaching it ends the round: free spins stop and a wincap event
+        # is emitted.
+        self.max_win = 5000
+
         # Symbol weights for base game
         self.symbol_weights_base = {
             Symbol.BLUE_GEM: 150,
@@ -111,12 +119,25 @@ class GameConfig:
         self.freespin_retrigger_amount = 5
         self.scatters_needed_for_trigger = 4
 
+        # Tumbles: winning symbols explode, survivors fall and the gaps are
+        # refilled from the mode's symbol weights while the board keeps
+        # winning, up to max_tumbles cascades per spin. Off by default; the
+        # exact calculator and batch engine model static boards only.
+        self.tumble_enabled = False
+        self.max_tumbles = 20
+
         # Special symbols
         self.special_symbols = {
             'scatter': [Symbol.SCATTER.value],
         }
 
-        # Bet modes
+        # Bet modes; cost is the price of a round in multiples of the bet.
+        # A bonus_buy mode starts straight in the free spins with
+        # bonus_buy_freespins awarded, without a base game board. Its cost
+        # is the expected round payout over the target RTP: 15 free spins
+        # pay 264.6x (264.8x uncapped, ExactCalculator.bonus_buy_value), and
+        # 264.6 / 0.96 = 275.7, rounded up to 276x (bonus RTP ~95.9%).
+        # Recompute it whenever the free spin weights or paytable change.
         self.bet_modes = {
             'MODE_BASE': {
                 'name': 'Base Game',
@@ -125,15 +146,109 @@ class GameConfig:
             'MODE_FREESPIN': {
                 'name': 'Free Spins',
                 'cost': 0.0,
-            }
+            },
+            'MODE_BONUS': {
+                'name': 'Bonus Buy',
+                'cost': 276.0,
+                'bonus_buy': True,
+            },
+        }
+        self.bonus_buy_freespins = 15
+
+        # Books files (books_{mode}.jsonl, run.py NUM_SIM_ARGS) -> bet mode
+        self.book_modes = {
+            'base': 'MODE_BASE',
+            'bonus': 'MODE_BONUS',
+        }
+
+        # Random streams: each GameState owns a generator seeded per sim.
+        # 'sim' seeds with base seed + sim id (historical books), 'hashed'
+        # derives a counter-based seed from blake2b(base seed, sim id).
+        self.rng_seed_mode = 'sim'
+        self.rng_base_seed = 0
+
+        # Simulation criteria for forced (stratified) book generation.
+        # 'scatters' conditions the opening board's scatter count (inclusive
+        # range); 'payout' splits the results of that board by final payout
+        # [min, max). Criteria sharing a scatter range must not overlap.
+        cells = self.rows * self.cols
+        self.criteria = {
+            'basegame': {'scatters': (0, self.scatters_needed_for_trigger - 1)},
+            'freegame': {'scatters': (self.scatters_needed_for_trigger, cells), 'payout': (0, 1000)},
+            'bigwin': {'scatters': (self.scatters_needed_for_trigger, cells), 'payout': (1000, None)},
         }
 
+        self.compile_symbol_tables()
+        self.compile_samplers()
+
+    def compile_symbol_tables(self) -> None:
+        """
+        Assign each symbol a small integer code and index the paytable by code.
+        Boards hold codes; names are only looked up when events are serialized.
+        Must be called again after editing the paytable.
+        """
+        self.symbol_names = [s.value for s in Symbol]
+        self.symbol_codes = {name: code for code, name in enumerate(self.symbol_names)}
+        self.scatter_code = self.symbol_codes[Symbol.SCATTER.value]
+        self.scatter_paytable = self.paytable.get(Symbol.SCATTER, [])
+
+        # (code, name, paytable) for every symbol that pays anywhere
+        self.paying_symbols = [
+            (self.symbol_codes[symbol.value], symbol.value, table)
+            for symbol, table in self.paytable.items()
+            if symbol is not Symbol.SCATTER
+        ]
+
+    def compile_samplers(self) -> None:
+        """
+        Compile weight tables into samplers used by the spin hot loop.
+        Samplers draw symbol codes. Must be called again after editing any
+        weight table.
+        """
+        codes = self.symbol_codes
+        self.symbol_samplers = {
+            'MODE_BASE': WeightedSampler({codes[s.value]: w for s, w in self.symbol_weights_base.items()}),
+            'MODE_FREESPIN': WeightedSampler({codes[s.value]: w for s, w in self.symbol_weights_freespins.items()}),
+        }
+        self.multiplier_sampler = WeightedSampler(self.multiplier_weights)
+
+        # Used to draw boards conditioned on their scatter count
+        cells = self.rows * self.cols
+        self.non_scatter_samplers = {}
+        self.scatter_count_probs = {}
+        for mode in ('MODE_BASE', 'MODE_FREESPIN'):
+            weights = self.get_symbol_weights(mode)
+            self.non_scatter_samplers[mode] = WeightedSampler(
+                {codes[s.value]: w for s, w in weights.items() if s is not Symbol.SCATTER}
+            )
+            p = weights.get(Symbol.SCATTER, 0) / sum(weights.values())
+            self.scatter_count_probs[mode] = [
+                comb(cells, k) * p ** k * (1 - p) ** (cells - k) for k in range(cells + 1)
+            ]
+
     def get_symbol_weights(self, mode: str) -> Dict:
         """Get symbol weights for specified mode"""
         if mode == 'MODE_FREESPIN':
             return self.symbol_weights_freespins
         return self.symbol_weights_base
 
+    def get_symbol_sampler(self, mode: str) -> WeightedSampler:
+        """Get compiled symbol sampler for specified mode"""
+        if mode == 'MODE_FREESPIN':
+            return self.symbol_samplers['MODE_FREESPIN']
+        return self.symbol_samplers['MODE_BASE']
+
+    def get_scatter_range_probability(self, scatter_range: Tuple[int, int], mode: str = 'MODE_BASE') -> float:
+        """Probability that a board's scatter count falls in the inclusive range"""
+        low, high = scatter_range
+        return sum(self.scatter_count_probs[mode][low:high + 1])
+
+    def get_bet_mode(self, book_mode: str) -> Dict:
+        """Bet mode a books file is simulated in (cost, bonus_buy)"""
+        if book_mode not in self.book_modes:
+            raise ValueError(f"Unknown book mode {book_mode!r}; add it to GameConfig.book_modes")
+        return self.bet_modes[self.book_modes[book_mode]]
+
     def get_multiplier_drop_chance(self, mode: str) -> float:
         """Get multiplier drop chance for specified mode"""
         if mode == 'MODE_FREESPIN':
@@ -1,104 +1,71 @@
 """
 Gates of Olympus - Game Events
 Event emission following Stake Engine format
+Events are recorded compactly (see EventRecorder) and expanded to Stake
+dicts when the book is serialized
 """
 
-from typing import Dict, List, Any
+from event_recorder import FREESPIN_END, SET_WIN, SET_TOTAL_WIN, FINAL_WIN, WINCAP
 
 
 def reveal_event(gamestate) -> None:
     """Emit board reveal event"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'reveal',
-        'board': gamestate.grid,
-        'gameType': gamestate.current_mode,
-    })
+    gamestate.book_events.reveal(gamestate.grid, gamestate.current_mode)
 
 
 def multiplier_drop_event(gamestate) -> None:
     """Emit multiplier drop event"""
     if gamestate.multipliers:
-        gamestate.book_events.append({
-            'index': len(gamestate.book_events),
-            'type': 'multiplierDrop',
-            'multipliers': gamestate.multipliers,
-        })
+        gamestate.book_events.multiplier_drop(gamestate.multipliers)
 
 
 def win_info_event(gamestate) -> None:
     """Emit win information event"""
     if gamestate.wins:
-        total_win = sum(w['payout'] for w in gamestate.wins)
-        gamestate.book_events.append({
-            'index': len(gamestate.book_events),
-            'type': 'winInfo',
-            'totalWin': total_win,
-            'wins': gamestate.wins,
-        })
+        gamestate.book_events.win_info(gamestate.wins, gamestate.grid)
+
+
+def tumble_event(gamestate, removed, new_symbols) -> None:
+    """Emit tumble (exploded cells and symbols dropped in)"""
+    gamestate.book_events.tumble(removed, new_symbols, gamestate.grid)
 
 
 def scatter_win_event(gamestate, scatter_count: int, payout: float) -> None:
     """Emit scatter win event"""
     if scatter_count >= 4 and payout > 0:
-        gamestate.book_events.append({
-            'index': len(gamestate.book_events),
-            'type': 'scatterWin',
-            'count': scatter_count,
-            'payout': payout,
-        })
+        gamestate.book_events.scatter_win(scatter_count, payout)
 
 
 def freespin_trigger_event(gamestate, spins_awarded: int) -> None:
     """Emit free spin trigger event"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'freespinTrigger',
-        'totalFs': spins_awarded,
-    })
+    gamestate.book_events.freespin_trigger(spins_awarded)
 
 
 def freespin_update_event(gamestate, current: int, total: int) -> None:
     """Emit free spin counter update"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'updateFreeSpin',
-        'amount': current,
-        'total': total,
-    })
+    gamestate.book_events.freespin_update(current, total)
 
 
 def freespin_end_event(gamestate, total_win: float) -> None:
     """Emit free spin end event"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'endFreeSpin',
-        'amount': total_win,
-    })
+    gamestate.book_events.amount(FREESPIN_END, total_win)
+
+
+def wincap_event(gamestate, amount: float) -> None:
+    """Emit max win reached (the round ends with this amount)"""
+    gamestate.book_events.amount(WINCAP, amount)
 
 
 def set_win_event(gamestate, amount: float) -> None:
     """Emit set win event"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'setWin',
-        'amount': amount,
-    })
+    gamestate.book_events.amount(SET_WIN, amount)
 
 
 def set_total_win_event(gamestate, amount: float) -> None:
     """Emit set total win event"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'setTotalWin',
-        'amount': amount,
-    })
+    gamestate.book_events.amount(SET_TOTAL_WIN, amount)
 
 
 def final_win_event(gamestate, amount: float) -> None:
     """Emit final win event"""
-    gamestate.book_events.append({
-        'index': len(gamestate.book_events),
-        'type': 'finalWin',
-        'amount': amount,
-    })
+    gamestate.book_events.amount(FINAL_WIN, amount)
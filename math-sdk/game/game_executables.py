@@ -4,54 +4,119 @@ Commonly used game actions and logic
 Following Stake Engine architecture
 """
 
-from typing import Dict, List, Any
-import random
+from typing import Dict, List, Any, Tuple
+
+from board import Board
+
+
+def cap_room(max_win, round_total):
+    """
+    Win a round can still pay before it reaches max_win. The cap applies
+    to the round total: the base spin win plus every free spin win so far.
+    Works elementwise on numpy arrays; None when uncapped.
+    """
+    if max_win is None:
+        return None
+    return max_win - round_total
 
 
 class GameExecutables:
     """Groups commonly used game actions"""
 
-    def draw_board(self, mode: str) -> None:
-        """Generate random grid based on symbol weights"""
-        weights = self.config.get_symbol_weights(mode)
-        symbols = list(weights.keys())
-        weight_values = list(weights.values())
-
-        self.grid = []
-        for col in range(self.config.cols):
-            column = []
-            for row in range(self.config.rows):
-                symbol = random.choices(symbols, weights=weight_values, k=1)[0]
-                column.append(symbol.value)
-            self.grid.append(column)
+    def draw_board(self, mode: str, scatter_range: Tuple[int, int] = None) -> None:
+        """
+        Generate random grid based on symbol weights
+        With scatter_range, the board is drawn conditioned on its scatter
+        count lying in that inclusive range
+        """
+        config = self.config
+        num_cells = config.cols * config.rows
+        if scatter_range is None:
+            cells = config.get_symbol_sampler(mode).draw_many(self.rng, num_cells)
+        else:
+            cells = self.draw_forced_scatter_cells(mode, scatter_range)
+        self.grid = Board(bytes(cells), config.cols, config.rows, config.symbol_names)
+
+    def draw_forced_scatter_cells(self, mode: str, scatter_range: Tuple[int, int]) -> List[int]:
+        """
+        Exact conditional draw: pick the scatter count from its binomial
+        distribution truncated to the range, place the scatters uniformly,
+        and fill every other cell from the non-scatter weights.
+        """
+        config = self.config
+        num_cells = config.cols * config.rows
+        low, high = scatter_range
+        mode_key = 'MODE_FREESPIN' if mode == 'MODE_FREESPIN' else 'MODE_BASE'
+
+        count_probs = config.scatter_count_probs[mode_key][low:high + 1]
+        count = self.rng.choices(range(low, high + 1), weights=count_probs, k=1)[0]
+        scatter_cells = set(self.rng.sample(range(num_cells), count))
+
+        fill = iter(config.non_scatter_samplers[mode_key].draw_many(self.rng, num_cells - count))
+        scatter_code = config.scatter_code
+        return [scatter_code if index in scatter_cells else next(fill) for index in range(num_cells)]
+
+    def tumble_board(self, mode: str, wins: List, counts: List[int]) -> Tuple[List[int], List[bytes]]:
+        """
+        Explode every winning symbol, let the survivors of each column fall
+        and refill the gaps at the top from the mode's symbol weights.
+        `counts` (per symbol code) is updated for the touched cells only.
+        Returns the exploded cell indices and the new symbols per column.
+        """
+        config = self.config
+        rows = config.rows
+        cells = self.grid.cells
+        exploding = {win.code for win in wins}
+
+        removed = [index for index, code in enumerate(cells) if code in exploding]
+        for code in exploding:
+            counts[code] = 0
+        refill = config.get_symbol_sampler(mode).draw_many(self.rng, len(removed))
+        for code in refill:
+            counts[code] += 1
+
+        fill = iter(refill)
+        new_cells = bytearray()
+        new_symbols = []
+        for start in range(0, len(cells), rows):
+            survivors = bytes(code for code in cells[start:start + rows] if code not in exploding)
+            top = bytes(next(fill) for _ in range(rows - len(survivors)))
+            new_symbols.append(top)
+            new_cells += top
+            new_cells += survivors
+
+        self.grid = Board(bytes(new_cells), config.cols, rows, config.symbol_names)
+        return removed, new_symbols
 
     def generate_multipliers(self, mode: str) -> None:
-        """Generate random multipliers based on drop chance"""
+        """Generate random multipliers based on drop chance, as (row, col, value)"""
         drop_chance = self.config.get_multiplier_drop_chance(mode)
-        mult_values = list(self.config.multiplier_weights.keys())
-        mult_weights = list(self.config.multiplier_weights.values())
+        sampler = self.config.multiplier_sampler
+        rand = self.rng.random
 
         self.multipliers = []
         for col in range(self.config.cols):
             for row in range(self.config.rows):
-                if random.random() < drop_chance:
-                    value = random.choices(mult_values, weights=mult_weights, k=1)[0]
-                    self.multipliers.append({
-                        'position': {'row': row, 'col': col},
-                        'value': value,
-                    })
+                if rand() < drop_chance:
+                    value = sampler.draw(self.rng)
+                    self.multipliers.append((row, col, value))
+
+    def cap_win(self, win: float, bet: float, round_total: float = 0.0) -> float:
+        """
+        Clip a spin win to the room left under max_win * bet (see cap_room),
+        round_total being what the round has won before this spin.
+        Sets wincap_reached when the cap is reached.
+        """
+        max_win = self.config.max_win
+        room = cap_room(None if max_win is None else max_win * bet, round_total)
+        if room is not None and win >= room:
+            self.wincap_reached = True
+            return room
+        return win
 
     def count_scatters(self) -> int:
         """Count scatter symbols on grid"""
-        count = 0
-        from game.game_config import Symbol
-
-        for col in self.grid:
-            for symbol in col:
-                if symbol == Symbol.SCATTER.value:
-                    count += 1
-
-        return count
+        return self.grid.count(self.config.scatter_code)
 
     def check_freespin_trigger(self, scatter_count: int) -> bool:
         """Check if free spins should be triggered"""
@@ -60,58 +125,3 @@ class GameExecutables:
     def update_freespin_amount(self, scatter_count: int) -> int:
         """Calculate free spins awarded based on scatter count"""
         return self.config.freespin_triggers.get(scatter_count, 15)
-
-    def emit_reveal_event(self) -> None:
-        """Emit board reveal event"""
-        self.book_events.append({
-            'type': 'reveal',
-            'grid': self.grid,
-            'gameType': self.current_mode,
-        })
-
-    def emit_multiplier_event(self) -> None:
-        """Emit multiplier drop event"""
-        if self.multipliers:
-            self.book_events.append({
-                'type': 'multiplierDrop',
-                'multipliers': self.multipliers,
-            })
-
-    def emit_win_event(self) -> None:
-        """Emit win information event"""
-        if self.wins:
-            self.book_events.append({
-                'type': 'winInfo',
-                'totalWin': sum(w['payout'] for w in self.wins),
-                'wins': self.wins,
-            })
-
-    def emit_scatter_event(self, scatter_count: int, payout: float) -> None:
-        """Emit scatter win event"""
-        self.book_events.append({
-            'type': 'scatterWin',
-            'count': scatter_count,
-            'payout': payout,
-        })
-
-    def emit_freespin_trigger_event(self, spins_awarded: int) -> None:
-        """Emit free spin trigger event"""
-        self.book_events.append({
-            'type': 'freespinTrigger',
-            'spins': spins_awarded,
-        })
-
-    def emit_freespin_update_event(self, current: int, total: int) -> None:
-        """Emit free spin counter update"""
-        self.book_events.append({
-            'type': 'updateFreeSpin',
-            'amount': current,
-            'total': total,
-        })
-
-    def emit_final_win_event(self, amount: float) -> None:
-        """Emit final win event"""
-        self.book_events.append({
-            'type': 'finalWin',
-            'amount': amount,
-        })
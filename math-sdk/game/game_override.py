@@ -4,6 +4,8 @@ Modifications to state machine behavior
 Following Stake Engine architecture
 """
 
+from event_recorder import EventRecorder, NullRecorder
+
 
 class GameStateOverride:
     """Override core GameState functionality"""
@@ -15,27 +17,34 @@ class GameStateOverride:
             super().reset_book()
 
         # Gates of Olympus specific resets
-        self.grid = []
+        self.current_mode = 'MODE_BASE'
+        self.grid = None
         self.multipliers = []
         self.active_multipliers = []
         self.wins = []
         self.total_win = 0.0
+        self.base_win = 0.0
+        self.freespin_win = 0.0
         self.scatter_count = 0
         self.freespins_triggered = False
         self.freespins_awarded = 0
         self.freespins_remaining = 0
-        self.book_events = []
+        self.freespins_played = 0
+        self.tumbles = 0
+        self.wincap_reached = False
+        # A fresh recorder per book: results handed out earlier keep their events
+        self.book_events = EventRecorder() if self.record_events else NullRecorder()
 
     def reset_fs_spin(self) -> None:
         """Reset free spin variables"""
         # Update game type
         self.current_mode = 'MODE_FREESPIN'
 
-        # Reset per-spin variables (but keep accumulated multipliers)
-        self.grid = []
+        # Reset per-spin variables (but keep accumulated multipliers and
+        # total_win, which already holds the triggering spin's win)
+        self.grid = None
         self.multipliers = []
         self.wins = []
-        self.total_win = 0.0
         self.scatter_count = 0
 
     def assign_special_sym_function(self) -> None:
@@ -3,13 +3,13 @@ Gates of Olympus - Game State
 Core simulation logic following Stake Engine architecture
 """
 
-import random
 from typing import Dict, List, Any
 
 from game_config import GameConfig, Symbol
 from game_executables import GameExecutables
 from game_calculations import GameCalculations
 from game_override import GameStateOverride
+from rng import SpinRNG
 import game_events
 
 
@@ -20,22 +20,28 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
     Following Stake Engine Method Resolution Order (MRO)
     """
 
-    def __init__(self, config: GameConfig):
+    def __init__(self, config: GameConfig, record_events: bool = True, outcomes=None):
         self.config = config
+        self.record_events = record_events
+        self.outcomes = outcomes  # OutcomeCache recording every board, or None
         self.current_mode = 'MODE_BASE'
         self.sim = 0
+        self.rng = SpinRNG(config.rng_seed_mode, config.rng_base_seed)
         self.reset_book()
         self.assign_special_sym_function()
 
     def reset_seed(self, sim: int) -> None:
-        """Reset random seed for reproducibility"""
+        """Start this sim's random stream (reproducible from the sim id alone)"""
         self.sim = sim
-        random.seed(sim)
+        self.rng.seed_sim(sim)
 
-    def run_spin(self, sim: int = 0, bet: float = 1.0) -> Dict[str, Any]:
+    def run_spin(self, sim: int = 0, bet: float = 1.0, scatter_range=None,
+                 bonus_buy: bool = False) -> Dict[str, Any]:
         """
         Main entry point for single spin simulation
         Called by create_books() from run.py
+        scatter_range forces the opening board's scatter count (criteria runs)
+        bonus_buy skips the base game and starts in the free spins
 
         This is the required entry point for Stake Engine
         """
@@ -45,14 +51,21 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
         # Reset book
         self.reset_book()
 
+        if bonus_buy:
+            self.total_win = self.run_bonus_buy(bet)
+            return self.finish_round(bet)
+
         # Step 1: Draw board
-        self.draw_board(self.current_mode)
+        self.draw_board(self.current_mode, scatter_range)
         game_events.reveal_event(self)
 
         # Step 2: Generate multipliers
         self.generate_multipliers(self.current_mode)
         game_events.multiplier_drop_event(self)
 
+        if self.outcomes is not None:
+            self.outcomes.add_board(self.grid, self.multipliers)
+
         # Step 3: Calculate wins
         self.wins = self.calculate_scatter_pays()
 
@@ -63,45 +76,107 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
         if self.wins:
             game_events.win_info_event(self)
 
+            # Step 5b: Tumble while the board keeps winning
+            if self.config.tumble_enabled:
+                self.run_tumbles(self.current_mode)
+
         # Step 6: Check scatter payout
         scatter_payout = self.calculate_scatter_payout(self.scatter_count)
         if scatter_payout > 0:
             game_events.scatter_win_event(self, self.scatter_count, scatter_payout)
 
         # Step 7: Calculate total payout
-        self.total_win = self.calculate_total_payout(bet)
+        self.total_win = self.cap_win(self.calculate_total_payout(bet), bet)
+        self.base_win = self.total_win
         game_events.set_win_event(self, self.total_win)
+        if self.wincap_reached:
+            game_events.wincap_event(self, self.total_win)
 
-        # Step 8: Check for free spins trigger
-        if self.check_freespin_trigger(self.scatter_count):
+        # Step 8: Check for free spins trigger (the round ends at the max win)
+        if not self.wincap_reached and self.check_freespin_trigger(self.scatter_count):
             self.freespins_triggered = True
             self.freespins_awarded = self.update_freespin_amount(self.scatter_count)
             self.freespins_remaining = self.freespins_awarded
             game_events.freespin_trigger_event(self, self.freespins_awarded)
 
-            # Run free spins
+            # Run free spins (the round pays the base win plus their total)
             freespin_total = self.run_freespin(bet)
             self.total_win += freespin_total
+            if self.wincap_reached:
+                self.total_win = self.config.max_win * bet
+
+        return self.finish_round(bet)
 
+    def finish_round(self, bet: float) -> Dict[str, Any]:
+        """Emit the final win events and return the book data"""
         # Step 9: Emit final win
         game_events.set_total_win_event(self, self.total_win)
         game_events.final_win_event(self, self.total_win)
+        if self.outcomes is not None:
+            self.outcomes.end_sim()
 
         # Return book data
         return {
             'payoutMultiplier': self.total_win / bet if bet > 0 else 0,
+            'base_win': self.base_win,
+            'freespin_win': self.freespin_win,
             'events': self.book_events,
             'grid': self.grid,
             'multipliers': self.multipliers,
             'wins': self.wins,
             'scatter_count': self.scatter_count,
             'freespins_triggered': self.freespins_triggered,
+            'freespins_played': self.freespins_played,
+            'tumbles': self.tumbles,
+            'wincap': self.wincap_reached,
         }
 
+    def run_bonus_buy(self, bet: float = 1.0) -> float:
+        """
+        Bonus buy round: the free spins are awarded straight away, without
+        a base game board. Returns the free spin total.
+        """
+        if self.outcomes is not None:
+            raise ValueError("Outcome caches hold base game rounds; bonus buys cannot be cached")
+        self.freespins_triggered = True
+        self.freespins_awarded = self.config.bonus_buy_freespins
+        self.freespins_remaining = self.freespins_awarded
+        game_events.freespin_trigger_event(self, self.freespins_awarded)
+        return self.run_freespin(bet)
+
+    def run_tumbles(self, mode: str) -> None:
+        """
+        Cascade the current board: explode the winning symbols, refill and
+        re-evaluate until nothing wins or max_tumbles cascades have run.
+        Symbol counts are maintained across cascades instead of recounted.
+        Afterwards self.wins holds the wins of every cascade and
+        self.scatter_count the scatters on the final board.
+        """
+        counts = self.calculate_symbol_counts()
+        wins = self.wins
+        all_wins = list(wins)
+        cascades = 0
+
+        while wins and cascades < self.config.max_tumbles:
+            removed, new_symbols = self.tumble_board(mode, wins, counts)
+            cascades += 1
+            game_events.tumble_event(self, removed, new_symbols)
+
+            wins = self.calculate_wins_from_counts(counts)
+            if wins:
+                self.wins = wins
+                game_events.win_info_event(self)
+                all_wins.extend(wins)
+
+        self.wins = all_wins
+        self.tumbles += cascades
+        self.scatter_count = counts[self.config.scatter_code]
+
     def run_freespin(self, bet: float = 1.0) -> float:
         """
         Execute free spin sequence
-        Returns total win from all free spins
+        Returns total win from all free spins (the sequence ends early
+        once it reaches the max win)
         """
         # Reset free spin state
         self.reset_fs_spin()
@@ -120,7 +195,7 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
             )
 
             # Reset per-spin state (keep accumulated multipliers)
-            self.grid = []
+            self.grid = None
             self.multipliers = []
             self.wins = []
 
@@ -132,11 +207,14 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
             self.generate_multipliers('MODE_FREESPIN')
 
             # Add new multipliers to accumulated pool
-            for mult in self.multipliers:
-                self.active_multipliers.append(mult['value'])
+            for _, _, value in self.multipliers:
+                self.active_multipliers.append(value)
 
             game_events.multiplier_drop_event(self)
 
+            if self.outcomes is not None:
+                self.outcomes.add_board(self.grid, self.multipliers)
+
             # Step 3: Calculate wins
             self.wins = self.calculate_scatter_pays()
 
@@ -147,16 +225,27 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
             if self.wins:
                 game_events.win_info_event(self)
 
+                # Step 5b: Tumble while the board keeps winning
+                if self.config.tumble_enabled:
+                    self.run_tumbles('MODE_FREESPIN')
+
             # Step 6: Check scatter payout
             scatter_payout = self.calculate_scatter_payout(self.scatter_count)
             if scatter_payout > 0:
                 game_events.scatter_win_event(self, self.scatter_count, scatter_payout)
 
-            # Step 7: Calculate spin payout
-            spin_win = self.calculate_total_payout(bet)
+            # Step 7: Calculate spin payout (the cap counts the triggering spin's win)
+            spin_win = self.cap_win(self.calculate_total_payout(bet), bet,
+                                    self.total_win + total_freespin_win)
             total_freespin_win += spin_win
             game_events.set_win_event(self, spin_win)
 
+            # Max win reached: the sequence ends here
+            if self.wincap_reached:
+                total_freespin_win = self.config.max_win * bet - self.total_win
+                game_events.wincap_event(self, self.config.max_win * bet)
+                break
+
             # Step 8: Check for retrigger
             if self.check_freespin_trigger(self.scatter_count):
                 self.freespins_remaining += self.config.freespin_retrigger_amount
@@ -168,5 +257,7 @@ class GameState(GameStateOverride, GameExecutables, GameCalculations):
 
         # Emit end free spin
         game_events.freespin_end_event(self, total_freespin_win)
+        self.freespins_played = spin_count
+        self.freespin_win = total_freespin_win
 
         return total_freespin_win
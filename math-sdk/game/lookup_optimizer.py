@@ -0,0 +1,216 @@
+"""
+Gates of Olympus - Lookup Table Optimizer
+Reweights an existing lookUpTable_{mode}.csv to hit target RTP exactly
+No re-simulation needed
+"""
+
+import math
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+
+class LookupRow:
+    """One lookup table row; the payout text is kept verbatim for rewriting"""
+
+    __slots__ = ('sim_id', 'weight', 'payout', 'payout_text')
+
+    def __init__(self, sim_id: int, weight: int, payout_text: str):
+        self.sim_id = sim_id
+        self.weight = weight
+        self.payout_text = payout_text
+        self.payout = float(payout_text)
+
+
+def read_lookup_table(path: Path) -> List[LookupRow]:
+    """Read a lookUpTable CSV (id, weight, payout)"""
+    rows = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                sim_id, weight, payout = line.split(',')
+                rows.append(LookupRow(int(sim_id), int(weight), payout))
+    return rows
+
+
+def write_lookup_table(path: Path, rows: List[LookupRow]) -> None:
+    """Write rows back in the same CSV format"""
+    with open(path, 'w') as f:
+        for row in rows:
+            f.write(f"{row.sim_id},{row.weight},{row.payout_text}\n")
+
+
+def weighted_rtp(rows: List[LookupRow], cost: float = 1.0) -> float:
+    """RTP in percent implied by the table weights"""
+    total = sum(row.weight for row in rows)
+    return sum(row.weight * row.payout for row in rows) / total / cost * 100 if total else 0.0
+
+
+def weighted_hit_rate(rows: List[LookupRow]) -> float:
+    """Weight share of rows with a non-zero payout"""
+    total = sum(row.weight for row in rows)
+    return sum(row.weight for row in rows if row.payout > 0) / total if total else 0.0
+
+
+class LookupTableOptimizer:
+    """
+    Solves integer lookup weights that meet RTP and distribution targets.
+
+    Rows are grouped into the zero-payout group, the requested payout
+    buckets [low, high) and a catch-all group for every other win. Each
+    group gets its target probability mass: the zero group gets
+    1 - target_hit_rate, buckets get bucket_targets, and the catch-all
+    group gets the remainder. Without a hit rate target the zero group
+    keeps its current share. Inside the groups, weights are exponentially
+    tilted (w * exp(lambda * payout)) with a single lambda found by
+    bisection so the RTP matches. The zero group is then trimmed by whole
+    units so the integer weights land on the target RTP exactly (to
+    within 1 / total weight).
+    """
+
+    def __init__(self, rows: List[LookupRow], target_rtp: float,
+                 target_hit_rate: Optional[float] = None,
+                 bucket_targets: Optional[Dict[Tuple[float, float], float]] = None,
+                 total_weight: int = 10 ** 12,
+                 cost: float = 1.0):
+        if not rows:
+            raise ValueError("Lookup table is empty")
+
+        self.rows = rows
+        self.target = target_rtp / 100 * cost
+        self.target_hit_rate = target_hit_rate
+        self.bucket_targets = bucket_targets or {}
+        self.total_weight = total_weight
+        self.cost = cost
+
+    def _groups(self) -> Dict[Any, List[LookupRow]]:
+        """Split rows into zero, bucket and catch-all groups"""
+        groups = {'zero': [], 'rest': []}
+        for bucket in self.bucket_targets:
+            groups[bucket] = []
+
+        for row in self.rows:
+            if row.payout == 0:
+                groups['zero'].append(row)
+                continue
+            for (low, high) in self.bucket_targets:
+                if low <= row.payout < high:
+                    groups[(low, high)].append(row)
+                    break
+            else:
+                groups['rest'].append(row)
+
+        return groups
+
+    def _group_mass(self, groups: Dict[Any, List[LookupRow]]) -> Dict[Any, float]:
+        """Target probability mass of every group"""
+        total = sum(row.weight for row in self.rows)
+        if self.target_hit_rate is not None:
+            zero_mass = 1.0 - self.target_hit_rate
+        else:
+            zero_mass = sum(row.weight for row in groups['zero']) / total
+
+        mass = {'zero': zero_mass}
+        mass.update(self.bucket_targets)
+        mass['rest'] = 1.0 - zero_mass - sum(self.bucket_targets.values())
+
+        for key, value in mass.items():
+            if value < -1e-12:
+                raise ValueError(f"Targets over-allocate probability (group {key}: {value:.6f})")
+            if value > 1e-12 and not groups[key]:
+                raise ValueError(f"No lookup rows available for group {key}")
+        return mass
+
+    @staticmethod
+    def _tilt(rows: List[LookupRow], lam: float) -> List[float]:
+        """Normalized tilted weights w * exp(lambda * payout) of one group"""
+        exponents = [lam * row.payout for row in rows]
+        shift = max(exponents)
+        raw = [row.weight * math.exp(e - shift) for row, e in zip(rows, exponents)]
+        total = sum(raw)
+        return [w / total for w in raw]
+
+    def _expected_payout(self, groups, mass, lam: float) -> float:
+        value = 0.0
+        for key, rows in groups.items():
+            if rows and mass[key] > 0:
+                probs = self._tilt(rows, lam)
+                value += mass[key] * sum(p * row.payout for p, row in zip(probs, rows))
+        return value
+
+    def solve(self, iterations: int = 200) -> Dict[str, Any]:
+        """Assign new integer weights to the rows and report the result"""
+        groups = self._groups()
+        mass = self._group_mass(groups)
+
+        low_bound = sum(mass[k] * min(r.payout for r in rows) for k, rows in groups.items() if rows)
+        high_bound = sum(mass[k] * max(r.payout for r in rows) for k, rows in groups.items() if rows)
+        if not low_bound <= self.target <= high_bound:
+            raise ValueError(
+                f"Target RTP {self.target / self.cost * 100:.4f}% is outside the reachable "
+                f"range {low_bound / self.cost * 100:.4f}% - {high_bound / self.cost * 100:.4f}%"
+            )
+
+        # Bisection on lambda; expected payout is increasing in lambda
+        low, high = -1.0, 1.0
+        for _ in range(64):
+            if self._expected_payout(groups, mass, low) <= self.target:
+                break
+            low *= 2
+        for _ in range(64):
+            if self._expected_payout(groups, mass, high) >= self.target:
+                break
+            high *= 2
+        for _ in range(iterations):
+            mid = (low + high) / 2
+            if self._expected_payout(groups, mass, mid) < self.target:
+                low = mid
+            else:
+                high = mid
+        lam = (low + high) / 2
+
+        for key, rows in groups.items():
+            if not rows:
+                continue
+            probs = self._tilt(rows, lam)
+            for p, row in zip(probs, rows):
+                row.weight = max(1, round(mass[key] * p * self.total_weight))
+
+        self._correct_zero_group(groups['zero'])
+
+        return {
+            'rtp': weighted_rtp(self.rows, self.cost),
+            'hit_rate': weighted_hit_rate(self.rows),
+            'lambda': lam,
+            'total_weight': sum(row.weight for row in self.rows),
+            'group_mass': {str(k): v for k, v in mass.items()},
+        }
+
+    def _correct_zero_group(self, zero_rows: List[LookupRow]) -> None:
+        """Absorb rounding error in the zero-payout weights so RTP is exact"""
+        if not zero_rows or self.target <= 0:
+            return
+
+        paid = sum(row.weight * row.payout for row in self.rows)
+        other = sum(row.weight for row in self.rows if row.payout != 0)
+        zero_total = round(paid / self.target) - other
+        current = sum(row.weight for row in zero_rows)
+        delta = zero_total - current
+        if delta == 0 or current + delta < len(zero_rows):
+            return
+
+        # Spread the correction proportionally, remainder on the largest row
+        applied = 0
+        for row in zero_rows:
+            share = int(delta * row.weight / current)
+            row.weight += share
+            applied += share
+        max(zero_rows, key=lambda row: row.weight).weight += delta - applied
+
+
+def optimize_lookup_table(path: Path, target_rtp: float, **kwargs) -> Dict[str, Any]:
+    """Read, reweight and rewrite a lookUpTable CSV in place"""
+    rows = read_lookup_table(path)
+    report = LookupTableOptimizer(rows, target_rtp, **kwargs).solve()
+    write_lookup_table(path, rows)
+    return report
@@ -0,0 +1,247 @@
+"""
+Gates of Olympus - Weight Optimizer
+Tunes GameConfig weight tables towards target RTP, hit rate and max-win rate
+"""
+
+import copy
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from exact_rtp import ExactCalculator
+
+TUNABLE_GROUPS = (
+    'symbol_weights_base',
+    'symbol_weights_freespins',
+    'multiplier_weights',
+    'multiplier_drop_chance',
+)
+
+
+def config_to_dict(config) -> Dict[str, Any]:
+    """Weight tables of a config in JSON form (config_math.json)"""
+    return {
+        'game_id': config.game_id,
+        'target_rtp': config.target_rtp,
+        'symbol_weights_base': {s.value: w for s, w in config.symbol_weights_base.items()},
+        'symbol_weights_freespins': {s.value: w for s, w in config.symbol_weights_freespins.items()},
+        'multiplier_weights': {str(v): w for v, w in config.multiplier_weights.items()},
+        'multiplier_drop_chance': dict(config.multiplier_drop_chance),
+    }
+
+
+def apply_config_dict(config, data: Dict[str, Any]) -> None:
+    """Load weight tables written by config_to_dict into a config"""
+    for group in ('symbol_weights_base', 'symbol_weights_freespins'):
+        if group in data:
+            table = getattr(config, group)
+            for symbol in table:
+                if symbol.value in data[group]:
+                    table[symbol] = data[group][symbol.value]
+    if 'multiplier_weights' in data:
+        for value in config.multiplier_weights:
+            if str(value) in data['multiplier_weights']:
+                config.multiplier_weights[value] = data['multiplier_weights'][str(value)]
+    if 'multiplier_drop_chance' in data:
+        config.multiplier_drop_chance.update(data['multiplier_drop_chance'])
+    config.compile_samplers()
+
+
+def load_config_math(config, path: Path) -> None:
+    """Apply a saved config_math.json to a config"""
+    with open(path) as f:
+        apply_config_dict(config, json.load(f))
+
+
+class WeightOptimizer:
+    """
+    Searches the weight tables for a config that hits the targets.
+
+    RTP and hit rate come from ExactCalculator, so each evaluation costs a
+    few milliseconds. Parameters are searched in log space (logit space for
+    drop chances) with a shrinking pattern search, plus a small penalty for
+    moving away from the starting weights so the table shape is kept.
+
+    A max-win rate target is matched by scaling the weights of the largest
+    multipliers, estimated with BatchSpinEngine on a fixed seed (needs
+    numpy); the RTP/hit rate search is re-run after every tail change.
+    The max win is the config's cap (config.max_win), the one the batch
+    engine applies, so set it on the config to tune for another cap.
+
+    The exact calculator models the uncapped game, so the result is
+    checked against a fixed-seed BatchSpinEngine run of verify_spins
+    spins with the cap applied (simulated_rtp in the report; skipped
+    when verify_spins is 0 or numpy is missing).
+    """
+
+    def __init__(self, config, target_rtp: Optional[float] = None,
+                 target_hit_rate: Optional[float] = None,
+                 target_max_win_rate: Optional[float] = None,
+                 groups: Tuple[str, ...] = TUNABLE_GROUPS,
+                 tail_multipliers: Tuple[float, ...] = (100, 500),
+                 regularization: float = 1e-4,
+                 max_evaluations: int = 2000,
+                 max_win_spins: int = 2_000_000,
+                 verify_spins: int = 1_000_000,
+                 seed: int = 0):
+        unknown = set(groups) - set(TUNABLE_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown weight groups: {sorted(unknown)}")
+
+        self.base_config = config
+        self.target_rtp = config.target_rtp if target_rtp is None else target_rtp
+        self.target_hit_rate = target_hit_rate
+        self.target_max_win_rate = target_max_win_rate
+        if target_max_win_rate and config.max_win is None:
+            raise ValueError("A max-win rate target needs a capped game (config.max_win)")
+        self.groups = groups
+        self.tail_multipliers = tail_multipliers
+        self.regularization = regularization
+        self.max_evaluations = max_evaluations
+        self.max_win_spins = max_win_spins
+        self.verify_spins = verify_spins
+        self.seed = seed
+
+        self.config = copy.deepcopy(config)
+        self.evaluations = 0
+        self.frozen = set()
+
+    def _parameters(self) -> List[Tuple[str, Any]]:
+        """(group, key) of every tunable entry"""
+        params = []
+        for group in self.groups:
+            for key in getattr(self.config, group):
+                if (group, key) not in self.frozen:
+                    params.append((group, key))
+        return params
+
+    @staticmethod
+    def _encode(group: str, value: float) -> float:
+        if group == 'multiplier_drop_chance':
+            return math.log(value / (1 - value))
+        return math.log(value)
+
+    @staticmethod
+    def _decode(group: str, x: float) -> float:
+        if group == 'multiplier_drop_chance':
+            return 1 / (1 + math.exp(-x))
+        return math.exp(x)
+
+    def _set(self, params, xs) -> None:
+        for (group, key), x in zip(params, xs):
+            getattr(self.config, group)[key] = self._decode(group, x)
+
+    def _objective(self, params, xs, x0) -> float:
+        self._set(params, xs)
+        self.evaluations += 1
+        result = ExactCalculator(self.config).calculate()
+
+        error = ((result['rtp'] - self.target_rtp) / self.target_rtp) ** 2
+        if self.target_hit_rate:
+            error += ((result['hit_rate'] - self.target_hit_rate) / self.target_hit_rate) ** 2
+        error += self.regularization * sum((x - start) ** 2 for x, start in zip(xs, x0))
+        return error
+
+    def fit_exact(self, tolerance: float = 1e-3) -> None:
+        """
+        Pattern search on RTP / hit rate using the exact calculator.
+        Stops when the step (in log-weight units) drops below tolerance or
+        after max_evaluations evaluations.
+        """
+        budget = self.evaluations + self.max_evaluations
+        params = self._parameters()
+        x0 = [self._encode(group, getattr(self.base_config, group)[key]) for group, key in params]
+        xs = [self._encode(group, getattr(self.config, group)[key]) for group, key in params]
+        best = self._objective(params, xs, x0)
+        step = 0.25
+
+        while step > tolerance and self.evaluations < budget:
+            improved = False
+            for i in range(len(xs)):
+                for delta in (step, -step):
+                    trial = list(xs)
+                    trial[i] += delta
+                    value = self._objective(params, trial, x0)
+                    if value < best:
+                        best, xs, improved = value, trial, True
+                        break
+            if not improved:
+                step /= 2
+
+        self._set(params, xs)
+
+    def estimate_max_win_rate(self) -> float:
+        """Share of spins reaching config.max_win, from a fixed-seed batch run"""
+        from batch_engine import BatchSpinEngine
+
+        result = BatchSpinEngine(self.config).run(self.max_win_spins, seed=self.seed)
+        return float((result.payouts >= self.config.max_win).mean())
+
+    def fit_max_win_rate(self, iterations: int = 12) -> None:
+        """Bisect a log-scale on the tail multiplier weights to meet the max-win rate"""
+        tail = [v for v in self.config.multiplier_weights if v in self.tail_multipliers]
+        base_weights = {v: self.config.multiplier_weights[v] for v in tail}
+        self.frozen.update(('multiplier_weights', v) for v in tail)
+
+        low, high = -6.0, 6.0
+        for _ in range(iterations):
+            mid = (low + high) / 2
+            for v in tail:
+                self.config.multiplier_weights[v] = base_weights[v] * math.exp(mid)
+            self.fit_exact()
+            if self.estimate_max_win_rate() < self.target_max_win_rate:
+                low = mid
+            else:
+                high = mid
+
+        self.frozen.difference_update(('multiplier_weights', v) for v in tail)
+
+    def optimize(self) -> Dict[str, Any]:
+        """Run the search and return the final evaluation"""
+        if self.target_max_win_rate:
+            self.fit_max_win_rate()
+        else:
+            self.fit_exact()
+
+        self._round_weights()
+        self.config.compile_samplers()
+
+        result = ExactCalculator(self.config).calculate()
+        report = {
+            'rtp': result['rtp'],
+            'hit_rate': result['hit_rate'],
+            'target_rtp': self.target_rtp,
+            'target_hit_rate': self.target_hit_rate,
+            'evaluations': self.evaluations,
+        }
+        if self.target_max_win_rate:
+            report['max_win_rate'] = self.estimate_max_win_rate()
+            report['target_max_win_rate'] = self.target_max_win_rate
+        if self.verify_spins:
+            report.update(self.simulate_rtp())
+        return report
+
+    def simulate_rtp(self) -> Dict[str, Any]:
+        """RTP of the optimized config from a fixed-seed batch run (None without numpy)"""
+        from batch_engine import BatchSpinEngine, np
+
+        if np is None:
+            return {'simulated_rtp': None, 'simulated_rtp_std_error': None}
+        result = BatchSpinEngine(self.config).run(self.verify_spins, seed=self.seed)
+        return {'simulated_rtp': result.rtp, 'simulated_rtp_std_error': result.std_error}
+
+    def _round_weights(self) -> None:
+        """Round weights to a readable precision (drop chances to 6 places)"""
+        for group in self.groups:
+            table = getattr(self.config, group)
+            digits = 6 if group == 'multiplier_drop_chance' else 3
+            for key, value in table.items():
+                table[key] = round(value, digits)
+
+    def write_config(self, path: Path) -> None:
+        """Write the optimized weight tables (config_math.json)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(config_to_dict(self.config), f, indent=2)
@@ -0,0 +1,261 @@
+"""
+Gates of Olympus - Outcome Cache
+Compact per-sim record of every board's symbol counts and multipliers, so
+payouts can be re-evaluated for a new paytable without re-simulating
+"""
+
+import json
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from game_executables import cap_room
+from optimizer import config_to_dict
+from payout_stats import PayoutStatistics
+
+# (attribute, typecode) of the stored arrays, in file order
+ARRAYS = (
+    ('board_ends', 'Q'),   # per sim: cumulative board count
+    ('counts', 'B'),       # per board: count of every symbol code
+    ('order_ends', 'Q'),   # per board: cumulative length of order_codes
+    ('order_codes', 'B'),  # symbols with 8+ cells, in order of first appearance
+    ('mult_ends', 'Q'),    # per board: cumulative multiplier count
+    ('mult_values', 'd'),  # multiplier values dropped on the board
+)
+
+# Weight tables the cached boards were drawn from
+WEIGHT_KEYS = ('symbol_weights_base', 'symbol_weights_freespins',
+               'multiplier_weights', 'multiplier_drop_chance')
+
+
+def weight_tables(config) -> Dict[str, Any]:
+    data = config_to_dict(config)
+    return {key: data[key] for key in WEIGHT_KEYS}
+
+
+class OutcomeCache:
+    """
+    Boards of a create_books run, one record per spin including every free
+    spin: the count of each symbol code (scatters included), the symbols
+    that could pay in order of first appearance, and the multiplier values.
+
+    That is everything a payout depends on while boards are static, so
+    evaluate() recomputes RTP for any paytable, scatter paytable or free
+    spin schedule that plays no more free spins than were simulated. The
+    first board of a sim is the base spin; the rest are its free spins.
+    """
+
+    def __init__(self, config, mode: str = 'base'):
+        if config.tumble_enabled:
+            raise ValueError("Outcomes cannot be cached with tumbles: the boards after a "
+                             "cascade depend on which symbols the paytable makes win")
+        self.mode = mode
+        self.symbol_names = list(config.symbol_names)
+        self.scatter_code = config.scatter_code
+        self.weights = weight_tables(config)
+        for name, typecode in ARRAYS:
+            setattr(self, name, array(typecode))
+
+    @property
+    def num_sims(self) -> int:
+        return len(self.board_ends)
+
+    @property
+    def num_boards(self) -> int:
+        return len(self.order_ends)
+
+    def add_board(self, board, multipliers) -> None:
+        """Record one spin's board and its (row, col, value) multipliers"""
+        cells = board.cells
+        counts = [cells.count(code) for code in range(len(self.symbol_names))]
+        self.counts.extend(counts)
+
+        scatter = self.scatter_code
+        order = sorted((cells.find(code), code) for code, count in enumerate(counts)
+                       if count >= 8 and code != scatter)
+        self.order_codes.extend(code for _, code in order)
+        self.order_ends.append(len(self.order_codes))
+
+        self.mult_values.extend(value for _, _, value in multipliers)
+        self.mult_ends.append(len(self.mult_values))
+
+    def end_sim(self) -> None:
+        """Close the current sim: its boards are those added since the last call"""
+        self.board_ends.append(self.num_boards)
+
+    def merge(self, other: 'OutcomeCache') -> None:
+        """Append the sims of a later shard"""
+        if other.symbol_names != self.symbol_names or other.weights != self.weights:
+            raise ValueError("Cannot merge outcome caches of different configs")
+        boards, orders, mults = self.num_boards, len(self.order_codes), len(self.mult_values)
+        self.board_ends.extend(end + boards for end in other.board_ends)
+        self.counts.extend(other.counts)
+        self.order_ends.extend(end + orders for end in other.order_ends)
+        self.order_codes.extend(other.order_codes)
+        self.mult_ends.extend(end + mults for end in other.mult_ends)
+        self.mult_values.extend(other.mult_values)
+
+    def save(self, path: Path) -> None:
+        """One JSON header line followed by the raw arrays"""
+        header = {
+            'mode': self.mode,
+            'symbols': self.symbol_names,
+            'scatter_code': self.scatter_code,
+            'weights': self.weights,
+            'byteorder': sys.byteorder,
+            'arrays': [[name, typecode, len(getattr(self, name))] for name, typecode in ARRAYS],
+        }
+        with open(path, 'wb') as f:
+            f.write(json.dumps(header).encode() + b'\n')
+            for name, _ in ARRAYS:
+                getattr(self, name).tofile(f)
+
+    @classmethod
+    def load(cls, path: Path) -> 'OutcomeCache':
+        cache = cls.__new__(cls)
+        with open(path, 'rb') as f:
+            header = json.loads(f.readline())
+            cache.mode = header['mode']
+            cache.symbol_names = header['symbols']
+            cache.scatter_code = header['scatter_code']
+            cache.weights = header['weights']
+            for name, typecode, length in header['arrays']:
+                values = array(typecode)
+                values.fromfile(f, length)
+                if header['byteorder'] != sys.byteorder:
+                    values.byteswap()
+                setattr(cache, name, values)
+        return cache
+
+    def check_config(self, config, check_weights: bool = True) -> None:
+        """Raise ValueError unless config draws boards the way the cached run did"""
+        if config.tumble_enabled:
+            raise ValueError("Cached outcomes are static boards; they cannot be evaluated with tumbles")
+        if list(config.symbol_names) != self.symbol_names:
+            raise ValueError("Config symbols do not match the cached symbol codes")
+        if check_weights and weight_tables(config) != self.weights:
+            raise ValueError("Config weight tables differ from the ones the cache was simulated with; "
+                             "only paytables and the free spin schedule may change")
+
+    def evaluate(self, config, return_payouts: bool = False, check_weights: bool = True) -> Dict[str, Any]:
+        """
+        Re-evaluate every cached sim under config's paytable, scatter
+        paytable and free spin schedule (payouts as multiples of the bet,
+        bit-identical to the simulation for an unchanged config).
+
+        A schedule that plays fewer free spins (e.g. a higher
+        scatters_needed_for_trigger or a lower max_win) is exact: later
+        spins are dropped.
+        One that needs a spin that was never simulated raises ValueError.
+
+        return_payouts adds the per-sim 'payouts' and 'freespins_played'
+        lists. check_weights=False skips the weight table check (the
+        Reweighter evaluates paytables of candidate weight tables).
+        """
+        self.check_config(config, check_weights)
+        num_symbols = len(self.symbol_names)
+        scatter = self.scatter_code
+        tables = {code: table for code, _, table in config.paying_symbols}
+        scatter_table = config.scatter_paytable
+        needed = config.scatters_needed_for_trigger
+        triggers = config.freespin_triggers
+        retrigger = config.freespin_retrigger_amount
+        max_win = config.max_win
+        counts, order_ends, order_codes = self.counts, self.order_ends, self.order_codes
+        mult_ends, mult_values = self.mult_ends, self.mult_values
+
+        def board_win(board: int) -> float:
+            # Same order of additions as GameCalculations.calculate_total_payout
+            base = counts[board * num_symbols:(board + 1) * num_symbols]
+            win = 0
+            for code in order_codes[order_ends[board - 1] if board else 0:order_ends[board]]:
+                table = tables.get(code)
+                if table is not None and base[code] < len(table) and table[base[code]] > 0:
+                    win += table[base[code]]
+            scatters = base[scatter]
+            if 4 <= scatters < len(scatter_table):
+                win += scatter_table[scatters]
+            return win
+
+        def board_mults(board: int):
+            return mult_values[mult_ends[board - 1] if board else 0:mult_ends[board]]
+
+        stats = PayoutStatistics()
+        base_total = 0.0
+        payouts = [] if return_payouts else None
+        spins_played = []
+        board = 0
+        for sim, end in enumerate(self.board_ends):
+            win = board_win(board)
+            if win > 0:
+                multiplier = 0.0
+                for value in board_mults(board):
+                    multiplier += value
+                if multiplier > 0:
+                    win = win * multiplier
+            room = cap_room(max_win, 0.0)
+            capped = room is not None and win >= room
+            if capped:
+                win = room
+            payout = win
+
+            scatters = counts[board * num_symbols + scatter]
+            triggered = not capped and scatters >= needed
+            played = 0
+            base_total += win
+            if triggered:
+                remaining = triggers.get(scatters, 15)
+                active = []
+                freespin_total = 0.0
+                capped_round = False
+                while remaining > 0:
+                    spin = board + 1 + played
+                    if spin >= end:
+                        raise ValueError(f"Sim {sim} needs free spin {played + 1} but only "
+                                         f"{end - board - 1} were simulated; the new config plays "
+                                         f"more free spins than the cached run")
+                    played += 1
+                    current = board_mults(spin)
+                    active.extend(current)
+                    spin_win = board_win(spin)
+                    if spin_win > 0:
+                        multiplier = sum(active, 0.0)
+                        for value in current:
+                            multiplier += value
+                        if multiplier > 0:
+                            spin_win = spin_win * multiplier
+                    room = cap_room(max_win, win + freespin_total)
+                    if room is not None and spin_win >= room:
+                        capped_round = True
+                        break
+                    freespin_total += spin_win
+                    if counts[spin * num_symbols + scatter] >= needed:
+                        remaining += retrigger
+                    remaining -= 1
+                # Capped rounds pay exactly the max win, as in GameState
+                payout = max_win * 1.0 if capped_round else win + freespin_total
+
+            stats.add(payout, triggered, played)
+            if payouts is not None:
+                payouts.append(payout)
+                spins_played.append(played)
+            board = end
+
+        report = stats.report()
+        report['base_rtp'] = base_total / stats.count * 100 if stats.count else 0.0
+        report['freespin_rtp'] = report['rtp'] - report['base_rtp']
+        if payouts is not None:
+            report['payouts'] = payouts
+            report['freespins_played'] = spins_played
+        return report
+
+
+def outcomes_path(library_path: Path, mode: str) -> Path:
+    return Path(library_path) / f"outcomes_{mode}.bin"
+
+
+def load_outcomes(library_path: Path, mode: str) -> Optional[OutcomeCache]:
+    """library/outcomes_{mode}.bin, or None if that run did not cache outcomes"""
+    path = outcomes_path(library_path, mode)
+    return OutcomeCache.load(path) if path.exists() else None
@@ -0,0 +1,223 @@
+"""
+Gates of Olympus - Payout Statistics
+Streaming (Welford) accumulators for RTP, volatility and payout distribution
+"""
+
+from bisect import bisect_right
+from math import sqrt
+from statistics import NormalDist
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+DEFAULT_BUCKET_EDGES = (1, 2, 5, 10, 20, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PayoutStatistics:
+    """
+    Per-spin statistics of one bet mode, updated in O(1) per spin.
+
+    Mean and variance of the payout use Welford's update, and shards are
+    combined with Chan's parallel formula (merge), so serial and sharded
+    runs agree. Payouts are in multiples of the bet. Buckets are the zero
+    payout, (0, edges[0]) and then [edges[i], edges[i + 1]), with the
+    last bucket open-ended.
+    """
+
+    def __init__(self, bucket_edges: Sequence[float] = DEFAULT_BUCKET_EDGES,
+                 max_win: Optional[float] = None):
+        self.bucket_edges = tuple(bucket_edges)
+        self.max_win = max_win
+
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hits = 0
+        self.triggers = 0
+        self.freespins = 0
+        self.max_payout = 0.0
+        self.max_win_hits = 0
+        self.zero_count = 0
+        self.bucket_counts = [0] * (len(self.bucket_edges) + 1)
+        self.bucket_payouts = [0.0] * (len(self.bucket_edges) + 1)
+
+    def add(self, payout: float, freespins_triggered: bool = False, freespins_played: int = 0) -> None:
+        """Record one spin"""
+        self.count += 1
+        delta = payout - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (payout - self.mean)
+
+        if payout > 0:
+            self.hits += 1
+            bucket = bisect_right(self.bucket_edges, payout)
+            self.bucket_counts[bucket] += 1
+            self.bucket_payouts[bucket] += payout
+            if payout > self.max_payout:
+                self.max_payout = payout
+            if self.max_win is not None and payout >= self.max_win:
+                self.max_win_hits += 1
+        else:
+            self.zero_count += 1
+
+        if freespins_triggered:
+            self.triggers += 1
+            self.freespins += freespins_played
+
+    def add_result(self, result: Dict[str, Any]) -> None:
+        """Record a run_spin result"""
+        self.add(result['payoutMultiplier'], result['freespins_triggered'], result['freespins_played'])
+
+    def merge(self, other: 'PayoutStatistics') -> None:
+        """Fold in the statistics of another shard (same bucket edges)"""
+        if other.bucket_edges != self.bucket_edges:
+            raise ValueError("Cannot merge statistics with different bucket edges")
+        if other.count == 0:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+
+        self.hits += other.hits
+        self.triggers += other.triggers
+        self.freespins += other.freespins
+        self.max_payout = max(self.max_payout, other.max_payout)
+        self.max_win_hits += other.max_win_hits
+        self.zero_count += other.zero_count
+        for i in range(len(self.bucket_counts)):
+            self.bucket_counts[i] += other.bucket_counts[i]
+            self.bucket_payouts[i] += other.bucket_payouts[i]
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the payout"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std_error(self) -> float:
+        """Standard error of the mean payout"""
+        return sqrt(self.variance / self.count) if self.count else 0.0
+
+    def rtp_half_width(self, confidence: float = 0.95, cost: float = 1.0) -> float:
+        """Half-width of the RTP confidence interval, in percent"""
+        return z_score(confidence) * self.std_error / cost * 100
+
+    def bucket_labels(self) -> List[Tuple[float, Optional[float]]]:
+        edges = self.bucket_edges
+        return [(0, edges[0])] + [
+            (edges[i], edges[i + 1] if i + 1 < len(edges) else None)
+            for i in range(len(edges))
+        ]
+
+    def report(self, cost: float = 1.0, confidence: float = 0.95) -> Dict[str, Any]:
+        """Summary for stats_{mode}.json; RTP figures in percent of the mode cost"""
+        n = self.count
+        rtp = self.mean / cost * 100
+        half_width = self.rtp_half_width(confidence, cost)
+        zero = {'low': 0, 'high': 0, 'count': self.zero_count,
+                'share': self.zero_count / n if n else 0.0, 'rtp': 0.0}
+        buckets = [zero] + [
+            {
+                'low': low,
+                'high': high,
+                'count': count,
+                'share': count / n if n else 0.0,
+                'rtp': paid / n / cost * 100 if n else 0.0,
+            }
+            for (low, high), count, paid in zip(self.bucket_labels(), self.bucket_counts, self.bucket_payouts)
+        ]
+        return {
+            'sims': n,
+            'rtp': rtp,
+            'rtp_std_error': self.std_error / cost * 100,
+            'confidence': confidence,
+            'rtp_confidence_interval': [rtp - half_width, rtp + half_width],
+            'payout_std': sqrt(self.variance),
+            'hit_rate': self.hits / n if n else 0.0,
+            'freespin_trigger_rate': self.triggers / n if n else 0.0,
+            'avg_freespins': self.freespins / self.triggers if self.triggers else 0.0,
+            'max_payout': self.max_payout,
+            'max_win': self.max_win,
+            'max_win_rate': self.max_win_hits / n if n and self.max_win is not None else None,
+            'buckets': buckets,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Accumulator state (for checkpoints)"""
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PayoutStatistics':
+        stats = cls(data['bucket_edges'], data['max_win'])
+        for key, value in data.items():
+            setattr(stats, key, tuple(value) if key == 'bucket_edges' else value)
+        return stats
+
+
+def z_score(confidence: float) -> float:
+    """Two-sided normal quantile, e.g. 1.96 for 0.95"""
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def stratified_report(strata: List[Tuple[PayoutStatistics, float]], cost: float = 1.0,
+                      confidence: float = 0.95,
+                      probability_covariance: Optional[Sequence[Sequence[float]]] = None) -> Dict[str, Any]:
+    """
+    Report for a criteria run: each stratum's statistics are weighted by
+    its probability, exactly as the lookup weights are. The RTP standard
+    error is the stratified one, sqrt(sum p_k^2 var_k / n_k) / sum p_k.
+
+    When the probabilities are themselves estimates, probability_covariance
+    (indexed like strata) adds their noise by the delta method: the mean
+    sum p_k m_k / sum p_k moves by (m_k - mean) / sum p_k per unit of p_k.
+    """
+    indexed = [(i, stats, p) for i, (stats, p) in enumerate(strata) if stats.count and p > 0]
+    if not indexed:
+        return PayoutStatistics().report(cost, confidence)
+
+    total = sum(p for _, _, p in indexed)
+    reports = [(stats.report(cost, confidence), stats, p / total) for _, stats, p in indexed]
+
+    def mix(key: str) -> float:
+        return sum(report[key] * w for report, _, w in reports)
+
+    mean = sum(stats.mean * w for _, stats, w in reports)
+    second_moment = sum((stats.variance + stats.mean ** 2) * w for _, stats, w in reports)
+    variance = sum(w * w * stats.variance / stats.count for _, stats, w in reports)
+    if probability_covariance is not None:
+        gradient = [(i, (stats.mean - mean) / total) for i, stats, _ in indexed]
+        variance += sum(g_i * g_j * probability_covariance[i][j]
+                        for i, g_i in gradient for j, g_j in gradient)
+    std_error = sqrt(max(0.0, variance))
+    rtp = mean / cost * 100
+    half_width = z_score(confidence) * std_error / cost * 100
+    trigger_rate = mix('freespin_trigger_rate')
+
+    buckets = []
+    for i, bucket in enumerate(reports[0][0]['buckets']):
+        buckets.append({
+            'low': bucket['low'],
+            'high': bucket['high'],
+            'count': sum(report['buckets'][i]['count'] for report, _, _ in reports),
+            'share': sum(report['buckets'][i]['share'] * w for report, _, w in reports),
+            'rtp': sum(report['buckets'][i]['rtp'] * w for report, _, w in reports),
+        })
+
+    max_win_rates = [report['max_win_rate'] for report, _, _ in reports]
+    return {
+        'sims': sum(stats.count for _, stats, _ in reports),
+        'rtp': rtp,
+        'rtp_std_error': std_error / cost * 100,
+        'confidence': confidence,
+        'rtp_confidence_interval': [rtp - half_width, rtp + half_width],
+        'payout_std': sqrt(max(0.0, second_moment - mean ** 2)),
+        'hit_rate': mix('hit_rate'),
+        'freespin_trigger_rate': trigger_rate,
+        'avg_freespins': (sum(report['freespin_trigger_rate'] * report['avg_freespins'] * w
+                              for report, _, w in reports) / trigger_rate) if trigger_rate else 0.0,
+        'max_payout': max(stats.max_payout for _, stats, _ in reports),
+        'max_win': reports[0][1].max_win,
+        'max_win_rate': None if None in max_win_rates else mix('max_win_rate'),
+        'buckets': buckets,
+    }
@@ -0,0 +1,152 @@
+"""
+Gates of Olympus - Profiler
+Per-phase timing of simulation runs (enabled by PROFILING in run.py)
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+
+# Phase -> GameState methods timed under it
+GAMESTATE_PHASES = {
+    'board_draw': ('draw_board', 'tumble_board'),
+    'multiplier_generation': ('generate_multipliers',),
+    'win_evaluation': (
+        'calculate_scatter_pays', 'calculate_symbol_counts', 'calculate_wins_from_counts',
+        'count_scatters', 'calculate_scatter_payout', 'calculate_total_payout',
+        'check_freespin_trigger', 'update_freespin_amount',
+    ),
+}
+
+PHASES = (
+    'board_draw',
+    'multiplier_generation',
+    'win_evaluation',
+    'event_emission',
+    'json_serialization',
+    'file_write',
+)
+
+
+class _TimedFile:
+    """File proxy that charges write() calls to a phase"""
+
+    def __init__(self, profiler, phase: str, file):
+        self._file = file
+        self.write = profiler.wrap(phase, file.write)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class PhaseProfiler:
+    """
+    Accumulates wall time per simulation phase.
+
+    Methods are wrapped on the instances (and module-level event functions
+    are patched) only inside instrument(), so normal runs pay nothing.
+    Nested timed calls are charged to the outermost phase, e.g. the
+    count_scatters call inside calculate_total_payout counts once.
+    """
+
+    def __init__(self):
+        self.totals = {phase: 0.0 for phase in PHASES}
+        self.calls = {phase: 0 for phase in PHASES}
+        self.spins = 0
+        self.elapsed = 0.0
+        self._depth = 0
+
+    def wrap(self, phase: str, func):
+        """Return func timed under phase"""
+        clock = time.perf_counter
+
+        def timed(*args, **kwargs):
+            if self._depth:
+                return func(*args, **kwargs)
+            self._depth += 1
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[phase] += clock() - start
+                self.calls[phase] += 1
+                self._depth -= 1
+
+        return timed
+
+    @contextmanager
+    def instrument(self, gamestate, writer):
+        """Time the phases of `gamestate` spins and `writer` output"""
+        events_module = sys.modules[type(gamestate).__module__].game_events
+        writer_module = sys.modules[type(writer).__module__]
+
+        patched_events = {
+            name: func for name, func in vars(events_module).items()
+            if name.endswith('_event') and callable(func)
+        }
+        original_encode = writer_module.encode_book
+        original_books_file = writer._books_file
+        original_lookup_file = writer._lookup_file
+        original_run_spin = gamestate.run_spin
+
+        for phase, methods in GAMESTATE_PHASES.items():
+            for method in methods:
+                setattr(gamestate, method, self.wrap(phase, getattr(gamestate, method)))
+        for name, func in patched_events.items():
+            setattr(events_module, name, self.wrap('event_emission', func))
+        writer_module.encode_book = self.wrap('json_serialization', original_encode)
+        writer._books_file = _TimedFile(self, 'file_write', original_books_file)
+        writer._lookup_file = _TimedFile(self, 'file_write', original_lookup_file)
+
+        def counted_run_spin(*args, **kwargs):
+            self.spins += 1
+            return original_run_spin(*args, **kwargs)
+
+        gamestate.run_spin = counted_run_spin
+        start = time.perf_counter()
+        try:
+            yield self
+            # Time the final partial buffer too; close() runs uninstrumented
+            writer.flush()
+        finally:
+            self.elapsed += time.perf_counter() - start
+            for methods in GAMESTATE_PHASES.values():
+                for method in methods:
+                    delattr(gamestate, method)
+            del gamestate.run_spin
+            for name, func in patched_events.items():
+                setattr(events_module, name, func)
+            writer_module.encode_book = original_encode
+            writer._books_file = original_books_file
+            writer._lookup_file = original_lookup_file
+
+    def report(self) -> Dict[str, Any]:
+        """Phase totals, shares and spins per second"""
+        timed = sum(self.totals.values())
+        phases = {
+            phase: {
+                'seconds': self.totals[phase],
+                'share': self.totals[phase] / self.elapsed if self.elapsed else 0.0,
+                'calls': self.calls[phase],
+            }
+            for phase in PHASES
+        }
+        phases['other'] = {
+            'seconds': max(0.0, self.elapsed - timed),
+            'share': max(0.0, self.elapsed - timed) / self.elapsed if self.elapsed else 0.0,
+            'calls': 0,
+        }
+        return {
+            'spins': self.spins,
+            'elapsed': self.elapsed,
+            'spins_per_second': self.spins / self.elapsed if self.elapsed else 0.0,
+            'phases': phases,
+        }
+
+    def print_report(self) -> None:
+        report = self.report()
+        print(f"\nProfile: {report['spins']:,} spins in {report['elapsed']:.2f}s "
+              f"({report['spins_per_second']:,.0f} spins/s)")
+        for phase, data in report['phases'].items():
+            print(f"  {phase:<22} {data['seconds']:8.3f}s  {data['share'] * 100:5.1f}%")
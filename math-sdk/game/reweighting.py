@@ -0,0 +1,172 @@
+"""
+Gates of Olympus - Reweighting
+Likelihood-ratio estimates of RTP under new weight tables from a cached run
+"""
+
+from math import sqrt
+from typing import Any, Dict
+
+from outcome_cache import OutcomeCache, weight_tables
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only needed for reweighting
+    np = None
+
+
+def table_probabilities(table: Dict[str, float], keys) -> 'np.ndarray':
+    """Draw probability of each key under a {key: weight} table (0 if absent)"""
+    total = sum(table.values())
+    return np.array([table.get(key, 0) / total for key in keys], dtype=float)
+
+
+class Reweighter:
+    """
+    Estimates the statistics of a cached run (OutcomeCache) as if its boards
+    had been drawn from other weight tables, without re-simulating.
+
+    Every cell is an independent draw, so a sim's likelihood ratio is
+    prod (p'_s / p_s) ** n_s over its played boards' symbol counts, times
+    the same for multiplier drops / values. Estimates are self-normalized
+    (sum w x / sum w), and the effective sample size (sum w) ** 2 / sum w ** 2
+    tells how far the candidate can move before they become unreliable.
+
+    config fixes the paytable and free spin schedule; the candidates passed
+    to estimate() only supply weight tables. Sensitivities are
+    d RTP / d ln(weight) in percentage points (a +1% weight change moves
+    RTP by about 1% of that), from the score function at the candidate.
+    """
+
+    def __init__(self, cache: OutcomeCache, config):
+        if np is None:
+            raise ImportError("Reweighter requires numpy (pip install numpy)")
+        self.cache = cache
+        self.cells = config.rows * config.cols
+        report = cache.evaluate(config, return_payouts=True, check_weights=False)
+        self.payouts = np.array(report['payouts'], dtype=float)
+        played = np.array(report['freespins_played'], dtype=np.int64)
+        self.triggered = played > 0
+        self.freespin_boards = played
+
+        num_symbols = len(cache.symbol_names)
+        board_ends = np.frombuffer(cache.board_ends, dtype=np.uint64).astype(np.int64)
+        num_sims = board_ends.size
+        starts = np.concatenate(([0], board_ends[:-1]))
+        sim_of_board = np.repeat(np.arange(num_sims), board_ends - starts)
+        position = np.arange(board_ends[-1] if num_sims else 0) - starts[sim_of_board]
+        base_boards = position == 0
+        fs_boards = (position > 0) & (position <= played[sim_of_board])
+
+        # Symbol counts per sim, split by the mode whose weights drew them
+        counts = np.frombuffer(cache.counts, dtype=np.uint8).reshape(-1, num_symbols).astype(np.int64)
+        self.symbol_counts = {'symbol_weights_base': counts[base_boards]}
+        fs_counts = np.zeros((num_sims, num_symbols), dtype=np.int64)
+        np.add.at(fs_counts, sim_of_board[fs_boards], counts[fs_boards])
+        self.symbol_counts['symbol_weights_freespins'] = fs_counts
+
+        # Multiplier drops per sim and mode, and value counts over both modes
+        mult_ends = np.frombuffer(cache.mult_ends, dtype=np.uint64).astype(np.int64)
+        drops = np.diff(np.concatenate(([0], mult_ends)))
+        self.drops = {
+            'base_game': drops[base_boards],
+            'free_spins': np.bincount(sim_of_board[fs_boards], weights=drops[fs_boards],
+                                      minlength=num_sims).astype(np.int64),
+        }
+        self.multiplier_keys = sorted(cache.weights['multiplier_weights'], key=float)
+        key_values = np.array([float(key) for key in self.multiplier_keys])
+        values = np.frombuffer(cache.mult_values, dtype=float)
+        board_of_mult = np.repeat(np.arange(drops.size), drops)
+        kept = base_boards[board_of_mult] | fs_boards[board_of_mult]
+        value_index = np.searchsorted(key_values, values[kept])
+        self.multiplier_counts = np.zeros((num_sims, len(key_values)), dtype=np.int64)
+        np.add.at(self.multiplier_counts, (sim_of_board[board_of_mult[kept]], value_index), 1)
+
+    def log_ratio_terms(self, counts, current, candidate, label: str):
+        """counts @ ln(candidate / current), -inf where a zero-probability draw was seen"""
+        if np.any((current == 0) & (candidate > 0)):
+            raise ValueError(f"Candidate {label} gives weight to outcomes the cached run never drew")
+        seen = current > 0
+        with np.errstate(divide='ignore'):
+            log_ratio = np.where(seen & (candidate > 0), np.log(candidate / np.where(seen, current, 1)), 0.0)
+        terms = counts @ log_ratio
+        impossible = (counts[:, seen & (candidate == 0)] > 0).any(axis=1)
+        return np.where(impossible, -np.inf, terms)
+
+    def log_likelihood_ratio(self, candidate_weights: Dict[str, Any]) -> 'np.ndarray':
+        current_weights = self.cache.weights
+        names = self.cache.symbol_names
+        log_ratio = np.zeros(self.payouts.size)
+
+        for group, counts in self.symbol_counts.items():
+            log_ratio += self.log_ratio_terms(
+                counts,
+                table_probabilities(current_weights[group], names),
+                table_probabilities(candidate_weights[group], names),
+                group,
+            )
+
+        log_ratio += self.log_ratio_terms(
+            self.multiplier_counts,
+            table_probabilities(current_weights['multiplier_weights'], self.multiplier_keys),
+            table_probabilities(candidate_weights['multiplier_weights'], self.multiplier_keys),
+            'multiplier_weights',
+        )
+
+        for mode, drops in self.drops.items():
+            cells = self.cells * (self.freespin_boards if mode == 'free_spins' else 1)
+            outcomes = np.stack([drops, cells - drops], axis=1)
+            current = current_weights['multiplier_drop_chance'][mode]
+            candidate = candidate_weights['multiplier_drop_chance'][mode]
+            log_ratio += self.log_ratio_terms(
+                outcomes, np.array([current, 1 - current]), np.array([candidate, 1 - candidate]),
+                f"multiplier_drop_chance[{mode}]",
+            )
+        return log_ratio
+
+    def estimate(self, candidate) -> Dict[str, Any]:
+        """
+        Estimated RTP (percent), hit rate, trigger rate, effective sample size
+        and sensitivities under the weight tables of config `candidate`
+        """
+        candidate_weights = weight_tables(candidate)
+        log_ratio = self.log_likelihood_ratio(candidate_weights)
+        if not np.isfinite(log_ratio).any():
+            raise ValueError("No cached sim is possible under the candidate weights")
+        # Self-normalized, so the ratios can be rescaled to avoid overflow
+        weights = np.exp(log_ratio - log_ratio.max())
+        weights /= weights.sum()
+
+        payouts = self.payouts
+        mean = float(weights @ payouts)
+        centered = payouts - mean
+        ess = 1.0 / float(weights @ weights)
+
+        names = self.cache.symbol_names
+        sensitivities = {}
+        for group, counts in self.symbol_counts.items():
+            p = table_probabilities(candidate_weights[group], names)
+            cells = self.cells * (self.freespin_boards if group == 'symbol_weights_freespins' else 1)
+            score = counts - np.outer(cells, p)
+            sensitivity = (weights * centered) @ score * 100
+            sensitivities[group] = {
+                name: float(sensitivity[code]) for code, name in enumerate(names)
+                if name in candidate_weights[group]
+            }
+        p = table_probabilities(candidate_weights['multiplier_weights'], self.multiplier_keys)
+        drops = self.drops['base_game'] + self.drops['free_spins']
+        score = self.multiplier_counts - np.outer(drops, p)
+        sensitivity = (weights * centered) @ score * 100
+        sensitivities['multiplier_weights'] = {
+            key: float(value) for key, value in zip(self.multiplier_keys, sensitivity)
+        }
+
+        return {
+            'sims': int(payouts.size),
+            'rtp': mean * 100,
+            'rtp_std_error': sqrt(float(weights ** 2 @ centered ** 2)) * 100,
+            'hit_rate': float(weights @ (payouts > 0)),
+            'freespin_trigger_rate': float(weights @ self.triggered),
+            'ess': ess,
+            'ess_fraction': ess / payouts.size,
+            'sensitivities': sensitivities,
+        }
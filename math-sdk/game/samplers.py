@@ -0,0 +1,38 @@
+"""
+Gates of Olympus - Weighted Samplers
+Weight tables compiled once into cumulative tables for fast draws
+"""
+
+from bisect import bisect
+from itertools import accumulate
+from typing import Any, Dict, List
+
+
+class WeightedSampler:
+    """
+    Cumulative-weight sampler for one weight table.
+
+    The table is accumulated once at construction; each draw is a single
+    rng.random() plus a bisect. Draws consume the random stream exactly
+    like random.choices(population, weights=...), so results are identical
+    to the uncompiled path for the same seed.
+    """
+
+    __slots__ = ('population', 'cum_weights', 'total', 'hi')
+
+    def __init__(self, weights: Dict[Any, float]):
+        self.population = list(weights.keys())
+        self.cum_weights = list(accumulate(weights.values()))
+        self.total = self.cum_weights[-1] + 0.0
+        self.hi = len(self.cum_weights) - 1
+
+        if self.total <= 0.0:
+            raise ValueError("Total of weights must be greater than zero")
+
+    def draw(self, rng) -> Any:
+        """Draw a single value"""
+        return self.population[bisect(self.cum_weights, rng.random() * self.total, 0, self.hi)]
+
+    def draw_many(self, rng, k: int) -> List[Any]:
+        """Draw k independent values in one call"""
+        return rng.choices(self.population, cum_weights=self.cum_weights, k=k)
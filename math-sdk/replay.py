@@ -0,0 +1,119 @@
+"""
+Gates of Olympus - Book Replay
+Rebuilds a single book from its sim id and audits it against the stored book
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+import sys
+
+# Add game directory to path
+sys.path.insert(0, str(Path(__file__).parent / 'game'))
+
+from game.game_config import GameConfig
+from game.gamestate import GameState
+from game.book_index import BookIndex, book_line_id, index_path_for, read_book_at
+from game.book_writer import books_filename, encode_book, read_book_lines
+from game.optimizer import load_config_math
+from run import make_book
+
+
+def replay_book(config: GameConfig, book_id: int, mode: str, bet: float = 1.0) -> Dict:
+    """Rebuild book `book_id` of a create_books run; sim id = book id - 1"""
+    if book_id < 1:
+        raise ValueError(f"Book ids start at 1, got {book_id}")
+    sim_num = book_id - 1
+    bonus_buy = config.get_bet_mode(mode).get('bonus_buy', False)
+    result = GameState(config).run_spin(sim_num, bet, bonus_buy=bonus_buy)
+    # Round-trip through the encoder so boards compare as stored
+    return json.loads(encode_book(make_book(sim_num, result, mode, bet)))
+
+
+def find_books_path(library_path: Path, mode: str) -> Path:
+    """books_{mode}.jsonl, or the compressed .jsonl.zst if that is all there is"""
+    plain = library_path / books_filename(mode)
+    compressed = library_path / books_filename(mode, compression=True)
+    if plain.exists() or not compressed.exists():
+        return plain
+    return compressed
+
+
+def fetch_book(books_path: Path, book_id: int) -> Optional[Dict]:
+    """Stored book by id: one seek with the offset index, otherwise a scan"""
+    index_path = index_path_for(books_path)
+    if books_path.suffix != '.zst' and index_path.exists():
+        return read_book_at(books_path, book_id, BookIndex.load(index_path))
+
+    for line in read_book_lines(books_path):
+        if book_line_id(line) == book_id:
+            return json.loads(line)
+    return None
+
+
+def diff_books(expected: Dict, stored: Dict, path: str = '') -> List[str]:
+    """Paths at which two books differ"""
+    if isinstance(expected, dict) and isinstance(stored, dict):
+        differences = []
+        for key in list(expected) + [k for k in stored if k not in expected]:
+            if key not in expected or key not in stored:
+                differences.append(f"{path}.{key}")
+            else:
+                differences.extend(diff_books(expected[key], stored[key], f"{path}.{key}"))
+        return differences
+    if isinstance(expected, list) and isinstance(stored, list):
+        if len(expected) != len(stored):
+            return [f"{path} (length {len(expected)} vs {len(stored)})"]
+        differences = []
+        for i, (a, b) in enumerate(zip(expected, stored)):
+            differences.extend(diff_books(a, b, f"{path}[{i}]"))
+        return differences
+    return [] if expected == stored else [path or '.']
+
+
+def main(argv: List[str] = None) -> int:
+    """Replay one book and, with --verify, compare it with the stored book"""
+    parser = argparse.ArgumentParser(description="Replay a Gates of Olympus book by sim id")
+    parser.add_argument('book_id', type=int, help="book id (sim id + 1)")
+    parser.add_argument('--mode', default='base', help="bet mode of the books file")
+    parser.add_argument('--bet', type=float, default=1.0)
+    parser.add_argument('--config-math', type=Path, help="config_math.json the books were simulated with")
+    parser.add_argument('--library', type=Path, default=Path(__file__).parent / 'library')
+    parser.add_argument('--verify', action='store_true', help="compare with the stored book")
+    parser.add_argument('--print', dest='print_book', action='store_true', help="print the replayed book")
+    args = parser.parse_args(argv)
+
+    config = GameConfig()
+    if args.config_math:
+        load_config_math(config, args.config_math)
+
+    book = replay_book(config, args.book_id, args.mode, args.bet)
+    if args.print_book or not args.verify:
+        print(json.dumps(book, indent=2))
+    if not args.verify:
+        return 0
+
+    books_path = find_books_path(args.library, args.mode)
+    stored = fetch_book(books_path, args.book_id)
+    if stored is None:
+        print(f"✗ Book {args.book_id} is not in {books_path}")
+        return 1
+    if stored['criteria'] in config.criteria:
+        print(f"✗ Book {args.book_id} comes from a criteria run; its seed is not its sim id")
+        return 1
+
+    differences = diff_books(book, stored)
+    if differences:
+        print(f"✗ Book {args.book_id} does not match {books_path}:")
+        for path in differences[:20]:
+            print(f"  {path}")
+        return 1
+
+    print(f"✓ Book {args.book_id} matches {books_path} "
+          f"(payout {book['payoutMultiplier']}x, {len(book['events'])} events)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
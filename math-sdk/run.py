@@ -3,10 +3,17 @@ Gates of Olympus - Simulation Entry Point
 Runs simulations and generates output files for Stake Engine
 """
 
+import argparse
+import cProfile
+import hashlib
 import json
-import random
+import os
+import time
+from collections import deque
+from contextlib import ExitStack, nullcontext
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
 import sys
 
 # Add game directory to path
@@ -14,74 +21,307 @@ sys.path.insert(0, str(Path(__file__).parent / 'game'))
 
 from game.game_config import GameConfig
 from game.gamestate import GameState
+from game.book_writer import BookWriter, books_filename, encode_book, encode_lookup_entry, lookup_filename
+from game.exact_rtp import ExactCalculator
+from game.optimizer import WeightOptimizer, config_to_dict
+from game.lookup_optimizer import optimize_lookup_table, read_lookup_table, write_lookup_table, weighted_rtp
+from game.book_compactor import BookCompactor
+from game.profiler import PhaseProfiler
+from game.payout_stats import DEFAULT_BUCKET_EDGES, PayoutStatistics, stratified_report
+from game.outcome_cache import OutcomeCache, outcomes_path
 
 # Simulation parameters
-NUM_THREADS = 1
+NUM_THREADS = 1          # Worker processes for book generation (1 = serial)
 RUST_THREADS = 4
-BATCHING_SIZE = 1000
-COMPRESSION = False
-PROFILING = False
+BATCHING_SIZE = 1000     # Sims per worker shard
+COMPRESSION = False      # Write books_{mode}.jsonl.zst (requires zstandard)
+COMPRESSION_LEVEL = 9    # zstd level, 1 (fast) to 22 (smallest)
+COMPRESSION_THREADS = 0  # zstd worker threads, 0 = single-threaded, -1 = all cores
+COMPACT_JSON = False     # Books without spaces after separators (uses orjson if installed)
+PROFILING = False        # Per-phase timing and spins/s (forces a serial run)
+PROFILING_DUMP = False   # Also dump cProfile stats to library/profile_{mode}.prof
+CHECKPOINT_INTERVAL = 100_000  # Sims between checkpoints (0 = off); resume with --resume
+CACHE_OUTCOMES = False   # Write library/outcomes_{mode}.bin for paytable re-evaluation
+SCHEDULER_PILOT_SIMS = 200  # Sims timed per mode to size and order multi-mode parallel shards
+
+# Statistics report (library/stats_{mode}.json)
+STATS_CONFIDENCE = 0.95                 # RTP confidence interval level
+STATS_BUCKET_EDGES = DEFAULT_BUCKET_EDGES  # Payout histogram edges (x bet)
+
+# Weight optimization (writes library/config_math.json and simulates with it)
+OPTIMIZE_WEIGHTS = False
+OPTIMIZER_TARGETS = {
+    'target_hit_rate': None,      # e.g. 0.40
+    'target_max_win_rate': None,  # e.g. 2e-7, needs numpy
+}
+
+# Lookup table reweighting after simulation (hits target_rtp exactly)
+OPTIMIZE_LOOKUP = False
+LOOKUP_TARGETS = {
+    'target_hit_rate': None,      # e.g. 0.35
+    'bucket_targets': None,       # e.g. {(100, 5000): 0.002}, payout range -> probability
+}
+
+# Book deduplication: keep N representative books per payout (or payout bucket)
+COMPACT_BOOKS = False
+COMPACT_KEEP_PER_GROUP = 10       # At least 2 with bucket edges
+COMPACT_BUCKET_EDGES = None       # e.g. [1, 5, 20, 100, 1000]; None = group by exact payout
 
-# Number of simulations per bet mode
+# Number of simulations per bet mode (GameConfig.book_modes: 'base', 'bonus' = bonus buy)
 NUM_SIM_ARGS = {
     'base': 100,  # Start small for testing
+    'bonus': 100,
 }
 
+# Adaptive sim counts: modes listed here stop at the first batch where the
+# RTP confidence half-width (STATS_CONFIDENCE, in percentage points) is at
+# most `tolerance`; NUM_SIM_ARGS is then the budget.
+ADAPTIVE_ARGS = {
+    # 'base': {'tolerance': 0.05, 'min_simulations': 100_000},
+}
+
+# Criteria-driven generation: books per criteria (see GameConfig.criteria).
+# Modes listed here use create_criteria_books instead of NUM_SIM_ARGS.
+CRITERIA_ARGS = {
+    # 'base': {'basegame': 9000, 'freegame': 1000, 'bigwin': 10},
+}
+CRITERIA_MAX_ATTEMPTS = 10_000_000   # Per scatter range, guards impossible criteria
+CRITERIA_ESTIMATE_DRAWS = 100_000     # Per scatter range, at least: draws estimating P(criteria)
+CRITERIA_SEED_STRIDE = 1_000_000_000  # Seed offset between scatter ranges
+CRITERIA_ESTIMATE_SEED_OFFSET = CRITERIA_SEED_STRIDE // 2  # Estimate draws' seeds within a range
+CRITERIA_TOTAL_WEIGHT = 10 ** 12      # Lookup weights of a criteria run sum to about this
+
+
+def make_book(sim_num: int, result: Dict, criteria: str, bet: float) -> Dict:
+    """Create book entry (Stake Engine format)"""
+    return {
+        'id': sim_num + 1,
+        'payoutMultiplier': result['payoutMultiplier'],
+        'events': result['events'],
+        'criteria': criteria,
+        'baseGameWins': result['base_win'],
+        'freeGameWins': result['freespin_win'],
+    }
+
+
+def make_lookup_entry(sim_num: int, result: Dict) -> Dict:
+    """Create lookup table entry"""
+    return {
+        'simulation_number': sim_num + 1,
+        'weight': 1,
+        'payout': result['payoutMultiplier'],
+    }
+
+
+def book_settings(config: GameConfig) -> Dict:
+    """Every config setting a book depends on, in JSON form (checkpoint fingerprint)"""
+    settings = config_to_dict(config)
+    settings.update({
+        'rows': config.rows,
+        'cols': config.cols,
+        'max_win': config.max_win,
+        'paytable': {symbol.value: table for symbol, table in config.paytable.items()},
+        'freespin_triggers': {str(count): spins for count, spins in config.freespin_triggers.items()},
+        'freespin_retrigger_amount': config.freespin_retrigger_amount,
+        'scatters_needed_for_trigger': config.scatters_needed_for_trigger,
+        'tumble_enabled': config.tumble_enabled,
+        'max_tumbles': config.max_tumbles,
+        'bet_modes': config.bet_modes,
+        'bonus_buy_freespins': config.bonus_buy_freespins,
+        'book_modes': config.book_modes,
+        'rng': [config.rng_seed_mode, config.rng_base_seed],
+    })
+    return settings
+
+
+def make_stats(config: GameConfig) -> PayoutStatistics:
+    """Statistics whose max-win rate is the rate of hitting config.max_win"""
+    return PayoutStatistics(STATS_BUCKET_EDGES, config.max_win)
+
+
+def run_shard(config: GameConfig, mode: str, start: int, end: int, bet: float,
+              compact: bool = False, cache_outcomes: bool = False
+              ) -> Tuple[str, str, List[float], PayoutStatistics, OutcomeCache]:
+    """
+    Run sims [start, end) in a worker process.
+    Each sim is seeded by its id, so shards are independent of each other.
+    Returns the encoded books, encoded lookup rows, per-sim payouts, the
+    shard's statistics and its outcome cache (None unless cache_outcomes).
+    """
+    outcomes = OutcomeCache(config, mode) if cache_outcomes else None
+    gamestate = GameState(config, outcomes=outcomes)
+    bonus_buy = config.get_bet_mode(mode).get('bonus_buy', False)
+    stats = make_stats(config)
+    book_lines = []
+    lookup_lines = []
+    payouts = []
+
+    for sim_num in range(start, end):
+        result = gamestate.run_spin(sim_num, bet, bonus_buy=bonus_buy)
+        book_lines.append(encode_book(make_book(sim_num, result, mode, bet), compact))
+        lookup_lines.append(encode_lookup_entry(make_lookup_entry(sim_num, result)))
+        payouts.append(result['payoutMultiplier'])
+        stats.add_result(result)
+
+    return ''.join(book_lines), ''.join(lookup_lines), payouts, stats, outcomes
+
+
+class ModeRun:
+    """Book generation state of one bet mode (see SimulationRunner.start_mode)"""
+
+    def __init__(self, mode: str, num_simulations: int, bet: float, cost: float,
+                 bonus_buy: bool = False, tolerance: float = None, min_simulations: int = 0):
+        self.mode = mode
+        self.num_simulations = num_simulations
+        self.bet = bet
+        self.cost = cost
+        self.bonus_buy = bonus_buy
+        self.tolerance = tolerance
+        self.min_simulations = min_simulations
+        self.checkpoint = None
+        self.start = 0
+        self.stats = None
+        self.outcomes = None
+        self.writer = None
+        self.stopped = False
+        self.completed = False
+
+    def target_met(self) -> bool:
+        """Adaptive stop: RTP half-width within tolerance after min_simulations"""
+        return (self.tolerance is not None and self.stats.count >= max(self.min_simulations, 2)
+                and self.stats.rtp_half_width(STATS_CONFIDENCE, self.cost) <= self.tolerance)
+
 
 class SimulationRunner:
     """Handles running simulations and generating output files"""
 
-    def __init__(self, config: GameConfig):
+    def __init__(self, config: GameConfig, num_threads: int = NUM_THREADS,
+                 batch_size: int = BATCHING_SIZE, compression: bool = COMPRESSION,
+                 profiling: bool = PROFILING, profiling_dump: bool = PROFILING_DUMP,
+                 checkpoint_interval: int = CHECKPOINT_INTERVAL, resume: bool = False,
+                 cache_outcomes: bool = CACHE_OUTCOMES):
         self.config = config
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.compression = compression
+        self.profiling = profiling
+        self.profiling_dump = profiling_dump
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.cache_outcomes = cache_outcomes
         self.library_path = Path(__file__).parent / 'library'
 
-    def create_books(self, num_simulations: int, mode: str, bet: float = 1.0):
+    def create_books(self, num_simulations: int, mode: str, bet: float = 1.0,
+                     tolerance: float = None, min_simulations: int = 0):
         """
         Create simulation books for specified mode
-        Generates books in Stake Engine format
+        Generates books in Stake Engine format, streaming each book and
+        lookup row to disk as soon as it is produced
+
+        With a tolerance, num_simulations is a budget: sims run in batches
+        until the RTP confidence half-width is within tolerance (and at
+        least min_simulations have run). The stop is checked only at batch
+        boundaries, so serial and parallel runs stop at the same sim.
+        """
+        run = self.start_mode(num_simulations, mode, bet, tolerance, min_simulations)
+        if run.completed:
+            return run.checkpoint['result']
+        profiler = PhaseProfiler() if self.profiling else None
+        dump = cProfile.Profile() if self.profiling_dump else None
+
+        if dump:
+            dump.enable()
+        with self.open_writer(run):
+            if self.num_threads > 1 and not (profiler or dump):
+                self.run_parallel([run])
+            else:
+                self.run_serial(run, profiler)
+        if dump:
+            dump.disable()
+            self.save_profile(dump, profiler, mode)
+        elif profiler:
+            self.save_profile(None, profiler, mode)
+
+        return self.finish_mode(run)
+
+    def create_all_books(self, mode_args: Dict[str, Dict], bet: float = 1.0) -> Dict[str, Dict]:
         """
+        Create books for several bet modes in one invocation. mode_args maps
+        each mode to its create_books arguments (num_simulations, optional
+        tolerance / min_simulations). Parallel runs share one process pool
+        across all modes (see run_parallel); serial and profiled runs go
+        mode by mode.
+
+        Each finished mode leaves a completed checkpoint, so a resumed run
+        skips it; the checkpoints are removed once every mode is done.
+        """
+        if self.num_threads <= 1 or self.profiling or self.profiling_dump or len(mode_args) < 2:
+            results = {mode: self.create_books(mode=mode, bet=bet, **args) for mode, args in mode_args.items()}
+        else:
+            runs = [self.start_mode(mode=mode, bet=bet, **args) for mode, args in mode_args.items()]
+            pending = [run for run in runs if not run.completed]
+            if pending:
+                with ExitStack() as stack:
+                    for run in pending:
+                        stack.enter_context(self.open_writer(run))
+                    self.run_parallel(pending)
+            results = {run.mode: run.checkpoint['result'] if run.completed else self.finish_mode(run)
+                       for run in runs}
+
+        for mode in mode_args:
+            self.checkpoint_path(mode).unlink(missing_ok=True)
+        return results
+
+    def start_mode(self, num_simulations: int, mode: str, bet: float = 1.0,
+                   tolerance: float = None, min_simulations: int = 0) -> ModeRun:
+        """Announce a mode and restore its checkpoint, statistics and outcome cache"""
+        bet_mode = self.config.get_bet_mode(mode)
+        run = ModeRun(mode, num_simulations, bet, bet_mode['cost'], bet_mode.get('bonus_buy', False),
+                      tolerance, min_simulations)
+
         print(f"\n{'='*60}")
-        print(f"Running {num_simulations:,} simulations for {mode}")
+        if tolerance is None:
+            print(f"Running {num_simulations:,} simulations for {mode}")
+        else:
+            print(f"Running {mode} until RTP is within ±{tolerance}% (budget {num_simulations:,} sims)")
+        if run.cost != 1:
+            print(f"{bet_mode['name']}: cost {run.cost:g}x bet")
         print(f"{'='*60}")
 
-        books = []
-        lookup_table = []
-        total_bet = 0.0
-        total_won = 0.0
-
-        gamestate = GameState(self.config)
-
-        for sim_num in range(num_simulations):
-            # Run simulation
-            result = gamestate.run_spin(sim_num, bet)
-
-            # Track statistics
-            total_bet += bet
-            total_won += result['payoutMultiplier'] * bet
-
-            # Create book entry (Stake Engine format)
-            book = {
-                'id': sim_num + 1,
-                'payoutMultiplier': result['payoutMultiplier'],
-                'events': result['events'],
-                'criteria': mode,
-                'baseGameWins': result['payoutMultiplier'] * bet,
-                'freeGameWins': 0.0,
-            }
-
-            books.append(book)
-
-            # Create lookup table entry
-            lookup_table.append({
-                'simulation_number': sim_num + 1,
-                'weight': 1,
-                'payout': result['payoutMultiplier'],
-            })
+        run.checkpoint = self.load_checkpoint(mode, num_simulations, bet) if self.resume else None
+        run.start = run.checkpoint['next_sim'] if run.checkpoint else 0
+        if run.checkpoint and run.checkpoint.get('completed'):
+            run.completed = True
+            print(f"{mode} already completed ({run.start:,} sims), skipping")
+            return run
+        if run.checkpoint:
+            run.stats = PayoutStatistics.from_dict(run.checkpoint['stats'])
+        else:
+            run.stats = make_stats(self.config)
+        if run.checkpoint:
+            print(f"Resuming from checkpoint at sim {run.start:,}")
+        if self.cache_outcomes and run.bonus_buy:
+            print("⚠ Outcomes are not cached for bonus buy modes (rounds have no base game board)")
+        elif self.cache_outcomes:
+            run.outcomes = self.record_outcomes(mode, bet, 0, run.start)
+        return run
+
+    def open_writer(self, run: ModeRun) -> BookWriter:
+        run.writer = BookWriter(self.library_path, run.mode, compression=self.compression,
+                                compression_level=COMPRESSION_LEVEL,
+                                compression_threads=COMPRESSION_THREADS,
+                                compact=COMPACT_JSON, resume=run.checkpoint)
+        return run.writer
+
+    def finish_mode(self, run: ModeRun) -> Dict:
+        """
+        Report a finished mode and write its statistics (after the writer is
+        closed), then mark its checkpoint completed
+        """
+        mode, writer, stats = run.mode, run.writer, run.stats
 
-            # Progress report
-            if (sim_num + 1) % 10 == 0:
-                current_rtp = (total_won / total_bet) * 100 if total_bet > 0 else 0
-                print(f"Progress: {sim_num + 1:,}/{num_simulations:,} | Current RTP: {current_rtp:.2f}%")
+        total_bet = run.bet * run.cost * writer.num_books
+        total_won = writer.total_payout * run.bet
 
         # Calculate final RTP
         rtp = (total_won / total_bet) * 100 if total_bet > 0 else 0
@@ -89,43 +329,403 @@ class SimulationRunner:
         print(f"Target RTP: {self.config.target_rtp}%")
         print(f"Difference: {(rtp - self.config.target_rtp):.2f}%")
 
-        # Save files
-        self.save_books(books, mode)
-        self.save_lookup_table(lookup_table, mode)
-
-        return {
+        if run.tolerance is not None:
+            half_width = stats.rtp_half_width(STATS_CONFIDENCE, run.cost)
+            if run.target_met():
+                print(f"Target met after {writer.num_books:,} sims: ±{half_width:.4f}% "
+                      f"(tolerance ±{run.tolerance}%)")
+            else:
+                print(f"⚠ Budget of {run.num_simulations:,} sims reached at ±{half_width:.4f}% "
+                      f"(tolerance ±{run.tolerance}%)")
+
+        print(f"✓ Saved {writer.num_books:,} books to {writer.books_path}")
+        print(f"✓ Generated lookup table: {writer.lookup_path}")
+        if run.outcomes is not None:
+            path = outcomes_path(self.library_path, mode)
+            run.outcomes.save(path)
+            print(f"✓ Cached {run.outcomes.num_boards:,} boards of {run.outcomes.num_sims:,} sims: {path}")
+        report = self.save_stats(stats.report(run.cost, STATS_CONFIDENCE), mode)
+
+        if OPTIMIZE_LOOKUP:
+            report = optimize_lookup_table(writer.lookup_path, self.config.target_rtp, cost=run.cost,
+                                           **LOOKUP_TARGETS)
+            print(f"✓ Reweighted lookup table: RTP {report['rtp']:.4f}% | "
+                  f"Hit rate {report['hit_rate'] * 100:.2f}%")
+
+        if COMPACT_BOOKS:
+            compactor = BookCompactor(writer.books_path, writer.lookup_path,
+                                      COMPACT_KEEP_PER_GROUP, COMPACT_BUCKET_EDGES, cost=run.cost)
+            report = compactor.compact()
+            print(f"✓ Compacted books: {report['books_before']:,} -> {report['books_after']:,} "
+                  f"(RTP {report['rtp_before']:.4f}% -> {report['rtp_after']:.4f}%)")
+
+        result = {
             'rtp': rtp,
             'total_bet': total_bet,
             'total_won': total_won,
-            'num_simulations': num_simulations,
+            'num_simulations': writer.num_books,
+            'stats': report,
         }
+        self.save_completed_checkpoint(run, result)
+        return result
 
-    def save_books(self, books: List[Dict], mode: str):
-        """Save simulation books to JSONL format"""
-        self.library_path.mkdir(parents=True, exist_ok=True)
+    def create_criteria_books(self, mode: str, quotas: Dict[str, int], bet: float = 1.0):
+        """
+        Criteria-driven (stratified) book generation.
+        Opening boards are drawn conditioned on each criteria's scatter range,
+        so rare outcomes such as free spin triggers fill their quota directly.
+        Results are sorted into criteria by payout; lookup weights are then
+        set to P(criteria) / books kept, so the weighted table stays unbiased.
+
+        P(criteria) is estimated from a separate block of draws, as many as
+        the quota draws took (at least CRITERIA_ESTIMATE_DRAWS). Counting the
+        quota draws themselves would be biased upward for the criteria whose
+        quota ends the loop, since the last draw is always one of its hits.
+        """
+        print(f"\n{'='*60}")
+        print(f"Running criteria simulations for {mode}: {quotas}")
+        print(f"{'='*60}")
+        bet_mode = self.config.get_bet_mode(mode)
+        if bet_mode.get('bonus_buy'):
+            raise ValueError(f"Criteria condition the base game board; "
+                             f"bonus buy mode {mode!r} cannot use them")
+        cost = bet_mode['cost']
+        if self.cache_outcomes:
+            print("⚠ Outcomes are not cached for criteria runs (opening boards are drawn conditioned)")
+
+        unknown = set(quotas) - set(self.config.criteria)
+        if unknown:
+            raise ValueError(f"Unknown criteria: {sorted(unknown)}")
+
+        # Criteria sharing a scatter range are filled from the same draws
+        ranges = {}
+        for name in quotas:
+            ranges.setdefault(tuple(self.config.criteria[name]['scatters']), []).append(name)
 
-        filename = f"books_{mode}.jsonl"
-        filepath = self.library_path / filename
+        gamestate = GameState(self.config)
+        estimator = GameState(self.config, record_events=False)
+        probabilities = {}
+        covariance = {}
+        kept = {name: 0 for name in quotas}
+        strata = {name: make_stats(self.config) for name in quotas}
+        book_criteria = {}
+        book_id = 0
+
+        with BookWriter(self.library_path, mode, compression=self.compression,
+                        compression_level=COMPRESSION_LEVEL,
+                        compression_threads=COMPRESSION_THREADS,
+                        compact=COMPACT_JSON) as writer:
+            for range_index, (scatter_range, names) in enumerate(ranges.items()):
+                range_probability = self.config.get_scatter_range_probability(scatter_range)
+                attempts = 0
+
+                while attempts < CRITERIA_MAX_ATTEMPTS and any(kept[n] < quotas[n] for n in names):
+                    seed = range_index * CRITERIA_SEED_STRIDE + attempts
+                    result = gamestate.run_spin(seed, bet, scatter_range)
+                    attempts += 1
+
+                    name = self._classify(names, result['payoutMultiplier'])
+                    if name is not None and kept[name] < quotas[name]:
+                        kept[name] += 1
+                        strata[name].add_result(result)
+                        book_criteria[book_id + 1] = name
+                        writer.write(make_book(book_id, result, name, bet), make_lookup_entry(book_id, result))
+                        book_id += 1
+
+                # Probabilities from draws independent of when the quotas filled
+                draws = max(attempts, CRITERIA_ESTIMATE_DRAWS)
+                observed = {name: 0 for name in names}
+                for draw in range(draws):
+                    seed = range_index * CRITERIA_SEED_STRIDE + CRITERIA_ESTIMATE_SEED_OFFSET + draw
+                    result = estimator.run_spin(seed, bet, scatter_range)
+                    name = self._classify(names, result['payoutMultiplier'])
+                    if name is not None:
+                        observed[name] += 1
+
+                shares = {name: observed[name] / draws for name in names}
+                for name in names:
+                    probabilities[name] = range_probability * shares[name]
+                    # Multinomial covariance of the estimates within the range
+                    for other in names:
+                        share = shares[name] if other == name else 0.0
+                        covariance[name, other] = (range_probability ** 2
+                                                   * (share - shares[name] * shares[other]) / draws)
+                    print(f"  {name}: {kept[name]:,}/{quotas[name]:,} books | "
+                          f"P = {probabilities[name]:.6g} ({attempts:,} quota draws, "
+                          f"{draws:,} estimate draws)")
+                    if kept[name] < quotas[name]:
+                        print(f"  ⚠ {name} quota not reached after {attempts:,} draws")
+                    elif observed[name] == 0:
+                        print(f"  ⚠ {name} never seen in {draws:,} estimate draws, P = 0")
+
+        # Stratified lookup weights: each book stands for P(criteria) / kept
+        rows = read_lookup_table(writer.lookup_path)
+        for row in rows:
+            name = book_criteria[row.sim_id]
+            row.weight = max(1, round(probabilities[name] / kept[name] * CRITERIA_TOTAL_WEIGHT))
+        write_lookup_table(writer.lookup_path, rows)
+
+        coverage = sum(probabilities.values())
+        rtp = weighted_rtp(rows, cost) if rows else 0.0
+        print(f"\n{mode} weighted RTP: {rtp:.2f}%")
+        print(f"Outcome coverage: {coverage * 100:.4f}%")
+        print(f"✓ Saved {writer.num_books:,} books to {writer.books_path}")
+        print(f"✓ Generated lookup table: {writer.lookup_path}")
+        names = list(quotas)
+        report = stratified_report([(strata[name], probabilities[name]) for name in names],
+                                   cost, STATS_CONFIDENCE,
+                                   [[covariance.get((name, other), 0.0) for other in names]
+                                    for name in names])
+        report = self.save_stats(report, mode)
 
-        with open(filepath, 'w') as f:
-            for book in books:
-                json.dump(book, f)
-                f.write('\n')
+        return {
+            'rtp': rtp,
+            'total_bet': bet * cost,
+            'total_won': rtp / 100 * bet * cost,
+            'num_simulations': writer.num_books,
+            'stats': report,
+        }
 
-        print(f"✓ Saved {len(books):,} books to {filepath}")
+    def _classify(self, names: List[str], payout: float):
+        """Criteria whose payout range [min, max) contains the payout"""
+        for name in names:
+            low, high = self.config.criteria[name].get('payout', (0, None))
+            if payout >= low and (high is None or payout < high):
+                return name
+        return None
 
-    def save_lookup_table(self, lookup_table: List[Dict], mode: str):
-        """Generate CSV lookup table for RGS (Stake Engine format)"""
-        self.library_path.mkdir(parents=True, exist_ok=True)
+    def checkpoint_path(self, mode: str) -> Path:
+        return self.library_path / f"checkpoint_{mode}.json"
 
-        filename = f"lookUpTable_{mode}.csv"
-        filepath = self.library_path / filename
+    def run_fingerprint(self, num_simulations: int, bet: float) -> Dict:
+        """Settings a checkpoint is only valid for"""
+        config_json = json.dumps(book_settings(self.config), sort_keys=True)
+        return {
+            'num_simulations': num_simulations,
+            'bet': bet,
+            'compression': self.compression,
+            'compression_level': COMPRESSION_LEVEL if self.compression else None,
+            'compact': COMPACT_JSON,
+            'config': hashlib.sha256(config_json.encode()).hexdigest(),
+            'rng': [self.config.rng_seed_mode, self.config.rng_base_seed],
+            'max_win': self.config.max_win,
+        }
+
+    def save_checkpoint(self, run: ModeRun, next_sim: int) -> None:
+        """Record that sims [0, next_sim) are on disk (written atomically)"""
+        checkpoint = self.run_fingerprint(run.num_simulations, run.bet)
+        checkpoint['next_sim'] = next_sim
+        checkpoint.update(run.writer.checkpoint())
+        checkpoint['stats'] = run.stats.to_dict()
+        self._write_checkpoint(run.mode, checkpoint)
 
+    def save_completed_checkpoint(self, run: ModeRun, result: Dict) -> None:
+        """
+        Record that the mode's output files are final, with its results,
+        so a resumed multi-mode run skips it (no checkpoint if they are off)
+        """
+        if not self.checkpoint_interval:
+            self.checkpoint_path(run.mode).unlink(missing_ok=True)
+            return
+        checkpoint = self.run_fingerprint(run.num_simulations, run.bet)
+        checkpoint['next_sim'] = run.writer.num_books
+        checkpoint['completed'] = True
+        checkpoint['result'] = result
+        self._write_checkpoint(run.mode, checkpoint)
+
+    def _write_checkpoint(self, mode: str, checkpoint: Dict) -> None:
+        """Write a checkpoint atomically"""
+        path = self.checkpoint_path(mode)
+        temp_path = path.with_name(f".{path.name}")
+        with open(temp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(temp_path, path)
+
+    def load_checkpoint(self, mode: str, num_simulations: int, bet: float):
+        """Checkpoint to resume this mode from, or None to start from scratch"""
+        path = self.checkpoint_path(mode)
+        if not path.exists():
+            print(f"No checkpoint for {mode}, starting from sim 0")
+            return None
+
+        with open(path) as f:
+            checkpoint = json.load(f)
+        for key, value in self.run_fingerprint(num_simulations, bet).items():
+            if checkpoint.get(key) != value:
+                raise ValueError(f"Checkpoint {path} was written with a different {key} "
+                                 f"({checkpoint.get(key)!r}, now {value!r}); delete it to start over")
+        return checkpoint
+
+    def _checkpoint_due(self, start: int, end: int) -> bool:
+        """Whether the sims [start, end) cross a checkpoint interval"""
+        interval = self.checkpoint_interval
+        return bool(interval) and end // interval > start // interval
+
+    def run_serial(self, run: ModeRun, profiler: PhaseProfiler = None) -> None:
+        """
+        Run the mode's remaining sims in this process, optionally under the
+        phase profiler. The adaptive stop is checked after every batch.
+        """
+        gamestate = GameState(self.config, outcomes=run.outcomes)
+        writer, stats = run.writer, run.stats
+
+        with profiler.instrument(gamestate, writer) if profiler else nullcontext():
+            for sim_num in range(run.start, run.num_simulations):
+                # Run simulation
+                result = gamestate.run_spin(sim_num, run.bet, bonus_buy=run.bonus_buy)
+                writer.write(make_book(sim_num, result, run.mode, run.bet),
+                             make_lookup_entry(sim_num, result))
+                stats.add_result(result)
+                if self._checkpoint_due(sim_num, sim_num + 1):
+                    self.save_checkpoint(run, sim_num + 1)
+
+                # Progress report and stop check, once per batch
+                if (sim_num + 1) % self.batch_size == 0 or sim_num + 1 == run.num_simulations:
+                    self.print_progress(run, sim_num + 1)
+                    if run.target_met():
+                        break
+
+    def record_outcomes(self, mode: str, bet: float, start: int, end: int) -> OutcomeCache:
+        """
+        Outcome cache of sims [start, end), replayed payout-only. Used on
+        resume, since the cache of the interrupted run was never written.
+        """
+        outcomes = OutcomeCache(self.config, mode)
+        gamestate = GameState(self.config, record_events=False, outcomes=outcomes)
+        if end > start:
+            print(f"Replaying sims {start:,}-{end - 1:,} for the outcome cache")
+        for sim_num in range(start, end):
+            gamestate.run_spin(sim_num, bet)
+        return outcomes
+
+    def print_progress(self, run: ModeRun, done: int) -> None:
+        stats = run.stats
+        print(f"Progress ({run.mode}): {done:,}/{run.num_simulations:,} | "
+              f"Current RTP: {stats.mean / run.cost * 100:.2f}% "
+              f"± {stats.rtp_half_width(STATS_CONFIDENCE, run.cost):.2f}%")
+
+    def save_stats(self, report: Dict, mode: str) -> Dict:
+        """Write stats_{mode}.json next to index.json and print the headline figures"""
+        filepath = self.library_path / f"stats_{mode}.json"
         with open(filepath, 'w') as f:
-            for entry in lookup_table:
-                f.write(f"{entry['simulation_number']},{entry['weight']},{entry['payout']}\n")
+            json.dump(report, f, indent=2)
+
+        low, high = report['rtp_confidence_interval']
+        print(f"RTP {report['confidence'] * 100:.0f}% CI: {low:.2f}% - {high:.2f}% | "
+              f"Hit rate: {report['hit_rate'] * 100:.2f}% | Std: {report['payout_std']:.2f}x")
+        if report['freespin_trigger_rate']:
+            print(f"Free spins: 1 in {1 / report['freespin_trigger_rate']:,.0f} | "
+                  f"Avg length: {report['avg_freespins']:.1f} spins")
+        print(f"✓ Saved statistics to {filepath}")
+        return report
+
+    def save_profile(self, dump: cProfile.Profile, profiler: PhaseProfiler, mode: str) -> None:
+        """Print the phase report and write profile_{mode}.json / .prof"""
+        if profiler:
+            profiler.print_report()
+            with open(self.library_path / f"profile_{mode}.json", 'w') as f:
+                json.dump(profiler.report(), f, indent=2)
+        if dump:
+            # Readable by pstats, snakeviz, and flameprof / gprof2dot for flamegraphs
+            filepath = self.library_path / f"profile_{mode}.prof"
+            dump.dump_stats(filepath)
+            print(f"✓ Saved cProfile stats to {filepath}")
+
+    def run_parallel(self, runs: List[ModeRun]) -> None:
+        """
+        Shard each mode's sim id range and run the shards on one process
+        pool. Only a bounded window of shards is in flight at a time to keep
+        memory flat, and each mode's shards are written back in sim id
+        order, so the output is identical to a serial run.
+
+        With several modes, shards are sized by expected cost: a timed pilot
+        measures each mode's cost per sim, and every batch_size batch of a
+        mode is split into about cost / cheapest cost shards, so a shard of
+        any mode takes about as long as a base game batch. Shards are then
+        submitted longest expected processing time first (LPT). A mode
+        whose adaptive stop is met submits no more shards; its shards still
+        in flight are discarded.
+        """
+        if len(runs) > 1:
+            costs = {run.mode: self.estimate_sim_cost(run) for run in runs}
+            cheapest = min((cost for cost in costs.values() if cost > 0), default=1.0)
+            parts = {mode: max(1, min(self.batch_size, round(cost / cheapest))) for mode, cost in costs.items()}
+            for run in runs:
+                print(f"{run.mode}: ~{costs[run.mode] * 1000:.3f} ms per sim, "
+                      f"{parts[run.mode]} shard(s) per batch")
+        else:
+            costs = {runs[0].mode: 1.0}
+            parts = {runs[0].mode: 1}
+
+        # Expected time of a full shard, the same for all shards of a mode,
+        # so the stable sort keeps each mode's shards in sim id order
+        shards = [
+            (costs[run.mode] * self.batch_size / parts[run.mode], run, start, end)
+            for run in runs
+            for start, end in self.shard_ranges(run, parts[run.mode])
+        ]
+        shards.sort(key=lambda shard: -shard[0])
+        print(f"Sharding into {len(shards):,} shards across {self.num_threads} workers")
+
+        max_in_flight = self.num_threads * 2
+        pending = deque()
+
+        with ProcessPoolExecutor(max_workers=self.num_threads) as executor:
+            for _, run, start, end in shards:
+                if run.stopped:
+                    continue
+                future = executor.submit(run_shard, self.config, run.mode, start, end, run.bet, COMPACT_JSON,
+                                         run.outcomes is not None)
+                pending.append((run, start, end, future))
+                while len(pending) >= max_in_flight:
+                    self._write_shard(*pending.popleft())
+
+            while pending:
+                self._write_shard(*pending.popleft())
+
+    def shard_ranges(self, run: ModeRun, parts: int = 1) -> List[Tuple[int, int]]:
+        """
+        Sim ranges of a mode's shards: its remaining sims cut at multiples
+        of batch_size (where serial runs check the adaptive stop), each
+        batch split into `parts` near-equal shards
+        """
+        ranges = []
+        start = run.start
+        while start < run.num_simulations:
+            end = min((start // self.batch_size + 1) * self.batch_size, run.num_simulations)
+            pieces = min(parts, end - start)
+            bounds = [start + (end - start) * i // pieces for i in range(pieces + 1)]
+            ranges.extend(zip(bounds[:-1], bounds[1:]))
+            start = end
+        return ranges
+
+    def estimate_sim_cost(self, run: ModeRun, sims: int = SCHEDULER_PILOT_SIMS) -> float:
+        """Seconds per sim of a mode, timed on a few of its sims (sizes and orders shards)"""
+        gamestate = GameState(self.config)
+        sim_ids = range(run.start, min(run.start + sims, run.num_simulations))
+        started = time.perf_counter()
+        for sim_num in sim_ids:
+            gamestate.run_spin(sim_num, run.bet, bonus_buy=run.bonus_buy)
+        return (time.perf_counter() - started) / max(len(sim_ids), 1)
 
-        print(f"✓ Generated lookup table: {filepath}")
+    def _write_shard(self, run: ModeRun, start: int, end: int, future) -> None:
+        """
+        Write a finished shard and checkpoint if due; at the end of a batch,
+        report progress and check the stop (as run_serial does)
+        """
+        if run.stopped:
+            future.cancel()
+            return
+        books_text, lookup_text, payouts, shard_stats, shard_outcomes = future.result()
+        run.writer.write_encoded(books_text, lookup_text, payouts)
+        run.stats.merge(shard_stats)
+        if run.outcomes is not None:
+            run.outcomes.merge(shard_outcomes)
+        if self._checkpoint_due(start, end):
+            self.save_checkpoint(run, end)
+        if end % self.batch_size == 0 or end == run.num_simulations:
+            self.print_progress(run, end)
+            run.stopped = run.target_met()
 
     def generate_index_file(self, modes: List[str]):
         """Generate index.json file (Stake Engine requirement)"""
@@ -138,9 +738,9 @@ class SimulationRunner:
         for mode in modes:
             index["modes"].append({
                 "name": mode,
-                "cost": 1.0,
-                "events": f"books_{mode}.jsonl.zst",
-                "weights": f"lookUpTable_{mode}.csv",
+                "cost": self.config.get_bet_mode(mode)['cost'],
+                "events": books_filename(mode, self.compression),
+                "weights": lookup_filename(mode),
             })
 
         filepath = self.library_path / 'index.json'
@@ -180,8 +780,32 @@ class SimulationRunner:
         print(f"\n✓ Generated config files in {self.library_path}")
 
 
-def main():
+def print_exact_summary(config: GameConfig, modes: List[str]) -> None:
+    """Exact base game figures, and the exact RTP of every bonus buy mode at its cost"""
+    calculator = ExactCalculator(config)
+    exact = calculator.calculate()
+    print(f"\nExact RTP: {exact['rtp']:.2f}% "
+          f"(base {exact['base_rtp']:.2f}% + free spins {exact['freespin_rtp']:.2f}%)")
+    print(f"Exact hit rate: {exact['hit_rate'] * 100:.2f}%")
+    if exact['freespin_trigger_rate'] > 0:
+        print(f"Free spin trigger rate: 1 in {1 / exact['freespin_trigger_rate']:,.0f}")
+    else:
+        print("Free spin trigger rate: 0 (the base game cannot trigger free spins)")
+    for mode in modes:
+        bet_mode = config.get_bet_mode(mode)
+        if bet_mode.get('bonus_buy'):
+            value = calculator.bonus_buy_value(config.bonus_buy_freespins)
+            print(f"Exact {mode} RTP: {value / bet_mode['cost'] * 100:.2f}% at cost "
+                  f"{bet_mode['cost']:g}x (target cost {value / config.target_rtp * 100:.1f}x)")
+
+
+def main(argv: List[str] = None):
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Gates of Olympus simulation")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue interrupted modes from library/checkpoint_{mode}.json")
+    args = parser.parse_args(argv)
+
     print("=" * 60)
     print("Gates of Olympus - Math SDK Simulation")
     print("=" * 60)
@@ -189,14 +813,34 @@ def main():
     # Initialize configuration
     config = GameConfig()
 
+    if OPTIMIZE_WEIGHTS:
+        print("\nOptimizing weights...")
+        optimizer = WeightOptimizer(config, **OPTIMIZER_TARGETS)
+        report = optimizer.optimize()
+        optimizer.write_config(Path(__file__).parent / 'library' / 'config_math.json')
+        print(f"✓ Optimized RTP: {report['rtp']:.3f}% | Hit rate: {report['hit_rate'] * 100:.2f}% "
+              f"({report['evaluations']:,} evaluations)")
+        if report.get('simulated_rtp') is not None:
+            simulated, error = report['simulated_rtp'], report['simulated_rtp_std_error']
+            print(f"  Simulated RTP: {simulated:.3f}% ± {error:.3f}%")
+            if abs(simulated - report['target_rtp']) > 3 * error:
+                print(f"⚠ Simulated RTP is more than 3 standard errors from the "
+                      f"{report['target_rtp']}% target")
+        config = optimizer.config
+
     # Create simulation runner
-    runner = SimulationRunner(config)
+    runner = SimulationRunner(config, resume=args.resume)
 
-    # Run simulations for each bet mode
+    # Run simulations for each bet mode; all non-criteria modes share one run
     results = {}
-    for mode, num_sims in NUM_SIM_ARGS.items():
-        result = runner.create_books(num_sims, mode)
-        results[mode] = result
+    for mode in NUM_SIM_ARGS:
+        if mode in CRITERIA_ARGS:
+            results[mode] = runner.create_criteria_books(mode, CRITERIA_ARGS[mode])
+    results.update(runner.create_all_books({
+        mode: {'num_simulations': num_sims, **ADAPTIVE_ARGS.get(mode, {})}
+        for mode, num_sims in NUM_SIM_ARGS.items() if mode not in CRITERIA_ARGS
+    }))
+    results = {mode: results[mode] for mode in NUM_SIM_ARGS}
 
     # Generate index file
     print(f"\n{'='*60}")
@@ -218,10 +862,15 @@ def main():
         print(f"  Total Bet: {result['total_bet']:,.2f}")
         print(f"  Total Won: {result['total_won']:,.2f}")
 
-    avg_rtp = sum(r['rtp'] for r in results.values()) / len(results)
-    print(f"\nAverage RTP: {avg_rtp:.2f}%")
-    print(f"Target RTP: {config.target_rtp}%")
-    print(f"Difference: {(avg_rtp - config.target_rtp):.2f}%")
+    if results:
+        avg_rtp = sum(r['rtp'] for r in results.values()) / len(results)
+        print(f"\nAverage RTP: {avg_rtp:.2f}%")
+        print(f"Target RTP: {config.target_rtp}%")
+        print(f"Difference: {(avg_rtp - config.target_rtp):.2f}%")
+
+    # Analytic values, free of simulation noise (static boards only)
+    if not config.tumble_enabled:
+        print_exact_summary(config, list(NUM_SIM_ARGS))
     print(f"\n{'='*60}")
     print("✓ All files generated successfully!")
     print(f"{'='*60}\n")
@@ -0,0 +1,44 @@
+"""
+Gates of Olympus - Test setup
+Puts math-sdk/ (run.py, replay.py) and game/ (flat game imports) on sys.path
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'game'))
+sys.path.insert(0, str(ROOT))
+
+from game_config import GameConfig, Symbol  # noqa: E402
+
+
+@pytest.fixture
+def config():
+    return GameConfig()
+
+
+@pytest.fixture
+def low_variance_config():
+    return make_low_variance_config()
+
+
+def make_low_variance_config() -> GameConfig:
+    """
+    Frequent one-spin free spin rounds with small multipliers and no cap:
+    the triggering spin's scatter pay is a large share of the RTP while
+    the payout variance stays low, so a few thousand sims separate payout
+    rules that differ on trigger rounds.
+    """
+    config = GameConfig()
+    config.symbol_weights_base[Symbol.SCATTER] = 60
+    config.paytable[Symbol.SCATTER] = [0, 0, 0, 0] + [2] * (config.rows * config.cols - 3)
+    config.freespin_triggers = {count: 1 for count in range(4, config.rows * config.cols + 1)}
+    config.freespin_retrigger_amount = 0
+    config.multiplier_weights = {2: 1, 3: 1}
+    config.max_win = None
+    config.compile_symbol_tables()
+    config.compile_samplers()
+    return config
@@ -0,0 +1,56 @@
+"""
+The bonus buy mode is priced at the target RTP
+"""
+
+import pytest
+
+from exact_rtp import ExactCalculator
+from game_config import Symbol
+from gamestate import GameState
+from payout_stats import PayoutStatistics
+from run import make_book, print_exact_summary
+
+
+def test_bonus_buy_cost_meets_target(config):
+    cost = config.get_bet_mode('bonus')['cost']
+    value = ExactCalculator(config).bonus_buy_value(config.bonus_buy_freespins)
+    assert abs(value / cost * 100 - config.target_rtp) < 0.5
+
+
+def test_bonus_buy_simulates_at_exact_value(config):
+    config.max_win = None
+    cost = config.get_bet_mode('bonus')['cost']
+    value = ExactCalculator(config).bonus_buy_value(config.bonus_buy_freespins)
+
+    gamestate = GameState(config, record_events=False)
+    stats = PayoutStatistics()
+    for sim in range(3000):
+        stats.add_result(gamestate.run_spin(sim, bonus_buy=True))
+    low, high = stats.report(cost, confidence=0.99)['rtp_confidence_interval']
+    assert low <= value / cost * 100 <= high
+
+
+def test_books_split_base_and_free_game_wins(config):
+    gamestate = GameState(config)
+    bonus = make_book(0, gamestate.run_spin(0, 2.0, bonus_buy=True), 'bonus', 2.0)
+    assert bonus['baseGameWins'] == 0
+    assert bonus['freeGameWins'] == bonus['payoutMultiplier'] * 2.0
+
+    for sim in range(2000):
+        result = gamestate.run_spin(sim, 2.0)
+        if result['freespins_triggered'] and result['base_win'] > 0:
+            break
+    else:
+        raise AssertionError("no paying trigger spin in 2000 sims")
+    book = make_book(sim, result, 'base', 2.0)
+    assert book['freeGameWins'] > 0
+    assert book['baseGameWins'] + book['freeGameWins'] == pytest.approx(book['payoutMultiplier'] * 2.0)
+
+
+def test_exact_summary_without_scatters(config, capsys):
+    config.symbol_weights_base[Symbol.SCATTER] = 0
+    config.compile_samplers()
+    print_exact_summary(config, ['bonus'])
+    output = capsys.readouterr().out
+    assert "Free spin trigger rate: 0" in output
+    assert "Exact bonus RTP" in output
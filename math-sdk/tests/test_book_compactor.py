@@ -0,0 +1,79 @@
+"""
+BookCompactor keeps RTP while dropping books
+"""
+
+import contextlib
+import io
+import shutil
+
+import pytest
+
+from book_compactor import BookCompactor
+from book_index import book_line_id
+from book_writer import read_book_lines
+from game_config import GameConfig
+from lookup_optimizer import read_lookup_table, weighted_rtp
+
+import run
+
+EDGES = [1, 5, 20, 100, 1000]
+
+
+@pytest.fixture(scope='module')
+def base_run(tmp_path_factory):
+    """5000 base game books and their lookup table"""
+    path = tmp_path_factory.mktemp('library')
+    runner = run.SimulationRunner(GameConfig(), checkpoint_interval=0)
+    runner.library_path = path
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.create_books(5000, 'base')
+    return path
+
+
+@pytest.fixture
+def library(base_run, tmp_path):
+    for path in base_run.iterdir():
+        shutil.copy(path, tmp_path)
+    return tmp_path
+
+
+def compactor(library, keep, edges=None):
+    return BookCompactor(library / 'books_base.jsonl', library / 'lookUpTable_base.csv', keep, edges)
+
+
+@pytest.mark.parametrize('keep', [2, 3, 10])
+def test_bucket_compaction_keeps_rtp(library, keep):
+    rtp = weighted_rtp(read_lookup_table(library / 'lookUpTable_base.csv'))
+    report = compactor(library, keep, EDGES).compact()
+
+    assert report['books_after'] < report['books_before'] / 50
+    assert report['rtp_before'] == pytest.approx(rtp, abs=1e-9)
+    assert report['rtp_after'] == pytest.approx(rtp, abs=1e-6)
+
+    rows = read_lookup_table(library / 'lookUpTable_base.csv')
+    assert weighted_rtp(rows) == pytest.approx(rtp, abs=1e-6)
+    assert all(row.weight >= 1 for row in rows)
+    book_ids = [book_line_id(line) for line in read_book_lines(library / 'books_base.jsonl')]
+    assert book_ids == [row.sim_id for row in rows]
+
+
+def test_exact_payout_compaction_keeps_rtp(library):
+    rtp = weighted_rtp(read_lookup_table(library / 'lookUpTable_base.csv'))
+    report = compactor(library, 1).compact()
+
+    assert report['books_after'] < report['books_before']
+    assert report['rtp_after'] == pytest.approx(rtp, abs=1e-9)
+
+
+def test_bucket_compaction_needs_two_books_per_group(library):
+    with pytest.raises(ValueError):
+        compactor(library, 1, EDGES)
+
+
+def test_compaction_reports_rtp_per_cost(library):
+    rtp = weighted_rtp(read_lookup_table(library / 'lookUpTable_base.csv'))
+    report = BookCompactor(library / 'books_base.jsonl', library / 'lookUpTable_base.csv',
+                           3, EDGES, cost=100.0).compact()
+
+    assert report['rtp_before'] == pytest.approx(rtp / 100, abs=1e-9)
+    assert report['rtp_after'] == pytest.approx(rtp / 100, abs=1e-6)
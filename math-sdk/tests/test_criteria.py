@@ -0,0 +1,76 @@
+"""
+Criteria runs: P(criteria) does not depend on when the quotas filled, and
+the stratified standard error includes the noise of those estimates
+"""
+
+import contextlib
+import io
+import json
+from collections import defaultdict
+from math import sqrt
+
+import pytest
+
+from game_config import GameConfig
+from lookup_optimizer import read_lookup_table
+from payout_stats import PayoutStatistics, stratified_report
+
+import run
+
+
+def criteria_weights(quotas, library_path):
+    """Total lookup weight of each criteria's books after a criteria run"""
+    config = GameConfig()
+    config.criteria = {
+        'blank': {'scatters': (0, 3), 'payout': (0, 0.01)},
+        'win': {'scatters': (0, 3), 'payout': (0.01, None)},
+    }
+    runner = run.SimulationRunner(config, checkpoint_interval=0)
+    runner.library_path = library_path
+    with contextlib.redirect_stdout(io.StringIO()):
+        report = runner.create_criteria_books('base', quotas)
+
+    with open(library_path / 'books_base.jsonl') as f:
+        criteria = {book['id']: book['criteria'] for book in map(json.loads, f)}
+    weights = defaultdict(int)
+    for row in read_lookup_table(library_path / 'lookUpTable_base.csv'):
+        weights[criteria[row.sim_id]] += row.weight
+    return weights, report
+
+
+def test_probabilities_independent_of_quotas(tmp_path, monkeypatch):
+    monkeypatch.setattr(run, 'CRITERIA_ESTIMATE_DRAWS', 2000)
+    # The blank quota ends the quota draws in one run, the win quota in the other
+    first, _ = criteria_weights({'blank': 3, 'win': 20}, tmp_path / 'first')
+    second, report = criteria_weights({'blank': 20, 'win': 3}, tmp_path / 'second')
+
+    for name in ('blank', 'win'):
+        assert first[name] == pytest.approx(second[name], rel=1e-9)
+    share = first['win'] / (first['win'] + first['blank'])
+    assert 0.2 < share < 0.8
+    assert report['stats']['rtp_std_error'] > 0
+
+
+def make_stats(payouts):
+    stats = PayoutStatistics()
+    for payout in payouts:
+        stats.add(payout)
+    return stats
+
+
+def test_stratified_error_includes_probability_noise():
+    low, high = make_stats([0, 1, 0, 1]), make_stats([10, 12, 10, 12])
+    strata = [(low, 0.75), (high, 0.25)]
+    # Two criteria splitting one range, estimated from 400 draws
+    draws = 400
+    covariance = [[0.75 * 0.25 / draws, -0.75 * 0.25 / draws],
+                  [-0.75 * 0.25 / draws, 0.75 * 0.25 / draws]]
+
+    sampling = stratified_report(strata)
+    combined = stratified_report(strata, probability_covariance=covariance)
+    assert combined['rtp'] == sampling['rtp']
+
+    # d mean / d p_high = m_high - m_low when the two shares sum to one
+    estimate_error = (high.mean - low.mean) * sqrt(0.75 * 0.25 / draws) * 100
+    assert combined['rtp_std_error'] == pytest.approx(
+        sqrt(sampling['rtp_std_error'] ** 2 + estimate_error ** 2))
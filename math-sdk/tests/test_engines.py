@@ -0,0 +1,27 @@
+"""
+Scalar GameState, BatchSpinEngine and ExactCalculator describe one payout rule
+"""
+
+from batch_engine import compare_with_scalar
+from gamestate import GameState
+
+
+def test_triggering_spin_win_is_paid(low_variance_config):
+    gamestate = GameState(low_variance_config)
+    for sim in range(200):
+        result = gamestate.run_spin(sim)
+        if result['freespins_triggered']:
+            break
+    else:
+        raise AssertionError("no trigger in 200 sims")
+
+    events = result['events'].to_stake()
+    base_win = next(event['amount'] for event in events if event['type'] == 'setWin')
+    freespin_total = next(event['amount'] for event in events if event['type'] == 'endFreeSpin')
+    assert base_win >= 2  # the 4+ scatter pay
+    assert result['payoutMultiplier'] == base_win + freespin_total
+
+
+def test_batch_matches_scalar(low_variance_config):
+    comparison = compare_with_scalar(low_variance_config, 20_000, seed=1)
+    assert abs(comparison['rtp_diff_sigma']) < 4
@@ -0,0 +1,41 @@
+"""
+ExactCalculator lies inside the Monte Carlo confidence interval of both engines
+"""
+
+from batch_engine import BatchSpinEngine
+from exact_rtp import ExactCalculator
+from gamestate import GameState
+from payout_stats import PayoutStatistics, z_score
+
+CONFIDENCE = 0.99
+
+
+def assert_inside(exact_rtp, rtp, std_error):
+    half_width = z_score(CONFIDENCE) * std_error
+    assert rtp - half_width <= exact_rtp <= rtp + half_width, (exact_rtp, rtp, half_width)
+
+
+def test_exact_inside_scalar_interval(low_variance_config):
+    exact = ExactCalculator(low_variance_config).calculate()
+    gamestate = GameState(low_variance_config, record_events=False)
+    stats = PayoutStatistics()
+    for sim in range(20_000):
+        stats.add_result(gamestate.run_spin(sim))
+
+    low, high = stats.report(confidence=CONFIDENCE)['rtp_confidence_interval']
+    assert low <= exact['rtp'] <= high
+    assert abs(stats.triggers / stats.count - exact['freespin_trigger_rate']) < 0.01
+
+
+def test_exact_inside_batch_interval(low_variance_config):
+    exact = ExactCalculator(low_variance_config).calculate()
+    result = BatchSpinEngine(low_variance_config).run(200_000, seed=2)
+    assert_inside(exact['rtp'], result.rtp, result.std_error)
+
+
+def test_exact_inside_batch_interval_default_game(config):
+    # The exact calculator models the uncapped game
+    config.max_win = None
+    exact = ExactCalculator(config).calculate()
+    result = BatchSpinEngine(config).run(500_000, seed=3)
+    assert_inside(exact['rtp'], result.rtp, result.std_error)
@@ -0,0 +1,32 @@
+"""
+WeightOptimizer results hold up in simulation
+"""
+
+import pytest
+
+from batch_engine import BatchSpinEngine
+from optimizer import WeightOptimizer
+
+
+def test_optimized_config_simulates_at_target(config):
+    config.max_win = None
+    report = WeightOptimizer(config, max_evaluations=300, verify_spins=300_000).optimize()
+
+    assert abs(report['rtp'] - report['target_rtp']) < 0.1
+    assert abs(report['simulated_rtp'] - report['target_rtp']) < 4 * report['simulated_rtp_std_error']
+
+
+
+def test_max_win_rate_counts_config_cap(config):
+    config.max_win = 50
+    optimizer = WeightOptimizer(config, target_max_win_rate=1e-3, max_win_spins=50_000)
+    payouts = BatchSpinEngine(config).run(50_000, seed=0).payouts
+
+    assert payouts.max() == 50
+    assert optimizer.estimate_max_win_rate() == (payouts >= 50).mean() > 0
+
+
+def test_max_win_rate_target_needs_cap(config):
+    config.max_win = None
+    with pytest.raises(ValueError, match='config.max_win'):
+        WeightOptimizer(config, target_max_win_rate=1e-3)
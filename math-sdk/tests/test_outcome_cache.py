@@ -0,0 +1,36 @@
+"""
+OutcomeCache.evaluate reproduces GameState payouts bit-exactly
+"""
+
+from game_config import GameConfig, Symbol
+from gamestate import GameState
+from outcome_cache import OutcomeCache
+
+SIMS = 2000
+
+
+def simulate(config, outcomes=None):
+    gamestate = GameState(config, record_events=False, outcomes=outcomes)
+    return [gamestate.run_spin(sim)['payoutMultiplier'] for sim in range(SIMS)]
+
+
+def test_evaluate_matches_simulation(config):
+    cache = OutcomeCache(config)
+    payouts = simulate(config, cache)
+
+    report = cache.evaluate(config, return_payouts=True)
+    assert report['payouts'] == payouts
+    assert any(report['freespins_played'])
+
+
+def test_evaluate_new_paytable(config):
+    cache = OutcomeCache(config)
+    simulate(config, cache)
+
+    changed = GameConfig()
+    changed.paytable[Symbol.CROWN] = [pay * 2 for pay in changed.paytable[Symbol.CROWN]]
+    changed.paytable[Symbol.SCATTER] = [pay / 2 for pay in changed.paytable[Symbol.SCATTER]]
+    changed.compile_symbol_tables()
+
+    report = cache.evaluate(changed, return_payouts=True)
+    assert report['payouts'] == simulate(changed)
@@ -0,0 +1,28 @@
+"""
+PhaseProfiler times every phase of a run, including the last buffered write
+"""
+
+from book_writer import BookWriter
+from gamestate import GameState
+from profiler import PhaseProfiler
+
+import run
+
+
+def test_short_run_times_file_write(config, tmp_path):
+    gamestate = GameState(config)
+    profiler = PhaseProfiler()
+    with BookWriter(tmp_path, 'base') as writer:
+        # Fewer books than the writer buffers, so only the final flush writes
+        assert writer.buffer_books > 300
+        with profiler.instrument(gamestate, writer):
+            for sim in range(300):
+                result = gamestate.run_spin(sim)
+                writer.write(run.make_book(sim, result, 'base', 1.0), run.make_lookup_entry(sim, result))
+
+    report = profiler.report()
+    assert report['spins'] == 300
+    assert report['phases']['file_write']['calls'] == 2  # books and lookup table
+    assert report['phases']['file_write']['seconds'] > 0
+    assert report['phases']['json_serialization']['calls'] == 300
+    assert (tmp_path / 'books_base.jsonl').read_text().count('\n') == 300
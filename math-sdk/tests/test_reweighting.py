@@ -0,0 +1,63 @@
+"""
+Reweighter: unchanged weights reproduce the cached run, and a small weight
+change lands inside the interval of a fresh fixed-seed simulation
+"""
+
+import copy
+from math import hypot
+
+import pytest
+
+from conftest import make_low_variance_config
+from game_config import Symbol
+from gamestate import GameState
+from outcome_cache import OutcomeCache
+from payout_stats import PayoutStatistics
+from reweighting import Reweighter
+
+SIMS = 20_000
+
+
+def simulate(config, sims, first_sim=0, outcomes=None):
+    gamestate = GameState(config, record_events=False, outcomes=outcomes)
+    stats = PayoutStatistics()
+    for sim in range(first_sim, first_sim + sims):
+        stats.add_result(gamestate.run_spin(sim))
+    return stats
+
+
+@pytest.fixture(scope='module')
+def cached_run():
+    config = make_low_variance_config()
+    cache = OutcomeCache(config)
+    stats = simulate(config, SIMS, outcomes=cache)
+    return config, cache, stats
+
+
+def test_unchanged_weights_reproduce_cached_run(cached_run):
+    config, cache, stats = cached_run
+    report = Reweighter(cache, config).estimate(config)
+
+    assert report['rtp'] == pytest.approx(stats.mean * 100, rel=1e-12)
+    assert report['ess'] == pytest.approx(SIMS, rel=1e-12)
+    assert report['sims'] == SIMS
+    assert report['freespin_trigger_rate'] == pytest.approx(stats.triggers / SIMS, rel=1e-12)
+
+
+def test_small_weight_change_matches_fresh_simulation(cached_run):
+    config, cache, cached_stats = cached_run
+    candidate = copy.deepcopy(config)
+    candidate.symbol_weights_base[Symbol.CROWN] *= 1.2
+    candidate.symbol_weights_base[Symbol.SCATTER] *= 0.9
+    candidate.multiplier_weights[3] *= 1.5
+    candidate.compile_samplers()
+
+    report = Reweighter(cache, config).estimate(candidate)
+    assert 0.5 < report['ess_fraction'] < 1
+
+    # Fresh sims on seeds the cached run never used
+    fresh = simulate(candidate, SIMS, first_sim=SIMS)
+    error = hypot(report['rtp_std_error'], fresh.std_error * 100)
+    assert abs(report['rtp'] - fresh.mean * 100) < 4 * error
+    # The change is large enough to see
+    assert abs(report['rtp'] - cached_stats.mean * 100) > 4 * report['rtp_std_error']
@@ -0,0 +1,159 @@
+"""
+SimulationRunner output files: index, parallel and resumed runs match serial ones
+"""
+
+import contextlib
+import io
+import json
+
+import pytest
+
+from book_writer import BookWriter
+from game_config import GameConfig, Symbol
+from gamestate import GameState
+
+import run
+
+
+def make_runner(library_path, **kwargs):
+    kwargs.setdefault('checkpoint_interval', 0)
+    runner = run.SimulationRunner(GameConfig(), **kwargs)
+    runner.library_path = library_path
+    return runner
+
+
+@pytest.mark.parametrize('compression', [False, True])
+def test_index_names_written_files(tmp_path, compression):
+    runner = make_runner(tmp_path, compression=compression)
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner.generate_index_file(['base', 'bonus'])
+    with open(tmp_path / 'index.json') as f:
+        index = json.load(f)
+
+    for entry in index['modes']:
+        with BookWriter(tmp_path, entry['name'], compression=compression) as writer:
+            assert entry['events'] == writer.books_path.name
+            assert entry['weights'] == writer.lookup_path.name
+    assert [entry['cost'] for entry in index['modes']] == [1.0, 276.0]
+
+
+MODES = {'base': {'num_simulations': 1500}, 'bonus': {'num_simulations': 300}}
+OUTPUTS = ['books_base.jsonl', 'lookUpTable_base.csv', 'books_bonus.jsonl', 'lookUpTable_bonus.csv']
+
+
+def create_all_books(library_path, mode_args=MODES, **kwargs):
+    runner = make_runner(library_path, batch_size=200, **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return runner.create_all_books(mode_args)
+
+
+def assert_same_outputs(expected_path, path):
+    for name in OUTPUTS:
+        assert (path / name).read_bytes() == (expected_path / name).read_bytes(), name
+
+
+@pytest.fixture(scope='module')
+def serial_run(tmp_path_factory):
+    path = tmp_path_factory.mktemp('serial')
+    create_all_books(path)
+    return path
+
+
+def test_sim_streams_are_independent():
+    config = GameConfig()
+    in_order = GameState(config, record_events=False)
+    payouts = [in_order.run_spin(sim)['payoutMultiplier'] for sim in range(50)]
+    alone = GameState(config, record_events=False)
+    assert [alone.run_spin(sim)['payoutMultiplier'] for sim in reversed(range(50))] == payouts[::-1]
+
+
+def test_parallel_matches_serial(serial_run, tmp_path):
+    create_all_books(tmp_path, num_threads=3)
+    assert_same_outputs(serial_run, tmp_path)
+
+
+@pytest.mark.parametrize('num_threads', [1, 3])
+def test_resume_matches_uninterrupted(serial_run, tmp_path, monkeypatch, num_threads):
+    # run.py imports the game package, so patch the class it writes with
+    method = 'write_encoded' if num_threads > 1 else 'write'
+    write = getattr(run.BookWriter, method)
+
+    def crash(self, *args):
+        write(self, *args)
+        if self.num_books >= 700:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(run.BookWriter, method, crash)
+    with pytest.raises(KeyboardInterrupt):
+        create_all_books(tmp_path, num_threads=num_threads, checkpoint_interval=400)
+    monkeypatch.setattr(run.BookWriter, method, write)
+    assert (tmp_path / 'checkpoint_base.json').exists()
+
+    create_all_books(tmp_path, num_threads=num_threads, checkpoint_interval=400, resume=True)
+    assert_same_outputs(serial_run, tmp_path)
+    assert not (tmp_path / 'checkpoint_base.json').exists()
+
+
+def test_adaptive_stop_matches_serial(tmp_path):
+    mode_args = {
+        'base': {'num_simulations': 3000, 'tolerance': 60, 'min_simulations': 400},
+        'bonus': {'num_simulations': 2000, 'tolerance': 8, 'min_simulations': 200},
+    }
+    serial = create_all_books(tmp_path / 'serial', mode_args)
+    parallel = create_all_books(tmp_path / 'parallel', mode_args, num_threads=3)
+
+    for mode, result in serial.items():
+        assert result['num_simulations'] < mode_args[mode]['num_simulations']
+        assert parallel[mode]['num_simulations'] == result['num_simulations']
+    assert_same_outputs(tmp_path / 'serial', tmp_path / 'parallel')
+
+
+def test_resume_skips_completed_modes(serial_run, tmp_path, monkeypatch):
+    write = run.BookWriter.write
+
+    def crash(self, *args):
+        write(self, *args)
+        if self.books_path.name == 'books_bonus.jsonl' and self.num_books >= 100:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(run.BookWriter, 'write', crash)
+    with pytest.raises(KeyboardInterrupt):
+        create_all_books(tmp_path, checkpoint_interval=400)
+    monkeypatch.setattr(run.BookWriter, 'write', write)
+    with open(tmp_path / 'checkpoint_base.json') as f:
+        assert json.load(f)['completed']
+
+    simulated = []
+    run_serial = run.SimulationRunner.run_serial
+
+    def record(self, mode_run, *args):
+        simulated.append(mode_run.mode)
+        run_serial(self, mode_run, *args)
+
+    monkeypatch.setattr(run.SimulationRunner, 'run_serial', record)
+    results = create_all_books(tmp_path, checkpoint_interval=400, resume=True)
+    assert simulated == ['bonus']
+    assert results['base']['num_simulations'] == MODES['base']['num_simulations']
+    assert_same_outputs(serial_run, tmp_path)
+    assert not (tmp_path / 'checkpoint_base.json').exists()
+
+
+@pytest.mark.parametrize('change', [
+    lambda config: config.paytable[Symbol.CROWN].__setitem__(8, 3.0),
+    lambda config: config.freespin_triggers.__setitem__(4, 10),
+    lambda config: setattr(config, 'freespin_retrigger_amount', 3),
+    lambda config: setattr(config, 'scatters_needed_for_trigger', 5),
+    lambda config: setattr(config, 'tumble_enabled', True),
+    lambda config: setattr(config, 'max_tumbles', 5),
+    lambda config: setattr(config, 'bonus_buy_freespins', 10),
+    lambda config: config.symbol_weights_base.__setitem__(Symbol.CROWN, 25),
+], ids=['paytable', 'triggers', 'retrigger', 'scatters_needed', 'tumbles', 'max_tumbles',
+        'bonus_buy_freespins', 'weights'])
+def test_checkpoint_rejects_changed_game(tmp_path, change):
+    runner = make_runner(tmp_path)
+    runner._write_checkpoint('base', {**runner.run_fingerprint(1000, 1.0), 'next_sim': 400})
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert runner.load_checkpoint('base', 1000, 1.0)['next_sim'] == 400
+    change(runner.config)
+    with pytest.raises(ValueError, match='different config'):
+        runner.load_checkpoint('base', 1000, 1.0)
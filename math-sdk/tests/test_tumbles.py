@@ -0,0 +1,98 @@
+"""
+Tumbles: maintained symbol counts match a recount after every cascade,
+max_tumbles bounds the cascades and tumbleBoard events serialize
+"""
+
+import json
+
+import pytest
+
+from book_writer import encode_book
+from game_config import Symbol
+from gamestate import GameState
+
+import run
+
+
+@pytest.fixture
+def tumble_config(config):
+    config.tumble_enabled = True
+    return config
+
+
+def win_keys(wins):
+    return [(win.code, win.count, win.payout) for win in wins]
+
+
+def checked_gamestate(config, **kwargs):
+    """GameState whose tumble_board checks the maintained counts after each cascade"""
+    gamestate = GameState(config, **kwargs)
+    tumble_board = gamestate.tumble_board
+    cascades = []
+
+    def checked(mode, wins, counts):
+        before = bytes(gamestate.grid.cells)
+        removed, new_symbols = tumble_board(mode, wins, counts)
+        exploding = {win.code for win in wins}
+        assert removed == [index for index, code in enumerate(before) if code in exploding]
+        assert counts == gamestate.calculate_symbol_counts()
+        recounted = gamestate.calculate_scatter_pays()
+        assert win_keys(gamestate.calculate_wins_from_counts(counts)) == win_keys(recounted)
+        cascades.append(len(removed))
+        return removed, new_symbols
+
+    gamestate.tumble_board = checked
+    return gamestate, cascades
+
+
+def test_counts_match_recount_after_every_cascade(tumble_config):
+    gamestate, cascades = checked_gamestate(tumble_config, record_events=False)
+    results = [gamestate.run_spin(sim) for sim in range(2000)]
+
+    assert len(cascades) == sum(result['tumbles'] for result in results)
+    assert any(result['tumbles'] > 1 for result in results)
+    assert any(result['tumbles'] and result['freespins_played'] for result in results)
+
+
+def test_bonus_buy_counts_match_recount(tumble_config):
+    gamestate, cascades = checked_gamestate(tumble_config, record_events=False)
+    for sim in range(50):
+        gamestate.run_spin(sim, bonus_buy=True)
+    assert cascades
+
+
+def test_max_tumbles_bounds_cascades(tumble_config):
+    # Crowns fill almost every board and pay at any count, so every refill wins again
+    cells = tumble_config.rows * tumble_config.cols
+    tumble_config.paytable[Symbol.CROWN] = [0] * 8 + [1] * (cells - 7)
+    tumble_config.symbol_weights_base[Symbol.CROWN] = 5000
+    tumble_config.symbol_weights_base[Symbol.SCATTER] = 0
+    tumble_config.max_tumbles = 3
+    tumble_config.compile_symbol_tables()
+    tumble_config.compile_samplers()
+
+    gamestate, _ = checked_gamestate(tumble_config, record_events=False)
+    tumbles = [gamestate.run_spin(sim)['tumbles'] for sim in range(200)]
+    assert max(tumbles) == 3
+    assert tumbles.count(3) > 150
+
+
+def test_tumble_events_serialize(tumble_config):
+    gamestate = GameState(tumble_config)
+    for sim in range(500):
+        result = gamestate.run_spin(sim)
+        if result['tumbles'] > 1:
+            break
+    else:
+        raise AssertionError("no multi-cascade spin in 500 sims")
+
+    book = json.loads(encode_book(run.make_book(sim, result, 'base', 1.0)))
+    tumbles = [event for event in book['events'] if event['type'] == 'tumbleBoard']
+    assert len(tumbles) == result['tumbles']
+    for event in tumbles:
+        assert event['explodingSymbols']
+        assert len(event['newSymbols']) == tumble_config.cols
+        assert sum(map(len, event['newSymbols'])) == len(event['explodingSymbols'])
+        for cell in event['explodingSymbols']:
+            assert 0 <= cell['row'] < tumble_config.rows and 0 <= cell['col'] < tumble_config.cols
+        assert all(name in tumble_config.symbol_codes for column in event['newSymbols'] for name in column)
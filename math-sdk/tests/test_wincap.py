@@ -0,0 +1,77 @@
+"""
+The max win cap applies to the round total (base win plus free spins) on
+every path: GameState, BatchSpinEngine and OutcomeCache
+"""
+
+import numpy as np
+
+from batch_engine import BatchSpinEngine
+from gamestate import GameState
+from outcome_cache import OutcomeCache
+
+SIMS = 20_000
+
+
+def scalar_payouts(config, sims=SIMS, outcomes=None):
+    gamestate = GameState(config, record_events=False, outcomes=outcomes)
+    return [gamestate.run_spin(sim) for sim in range(sims)]
+
+
+def test_scalar_round_total_capped(low_variance_config):
+    low_variance_config.max_win = 5
+    results = scalar_payouts(low_variance_config, 2000)
+
+    assert max(result['payoutMultiplier'] for result in results) == 5
+    for result in results:
+        assert result['wincap'] == (result['payoutMultiplier'] == 5)
+    # Rounds that reach the cap in the free spins after a base win
+    assert any(result['wincap'] and result['freespins_played'] for result in results)
+
+
+def test_capped_freespin_round_events(low_variance_config):
+    low_variance_config.max_win = 5
+    gamestate = GameState(low_variance_config)
+    for sim in range(2000):
+        result = gamestate.run_spin(sim)
+        if result['wincap'] and result['freespins_played']:
+            break
+    else:
+        raise AssertionError("no capped free spin round in 2000 sims")
+
+    events = result['events'].to_stake()
+    amounts = {event['type']: event['amount'] for event in events if 'amount' in event}
+    base_win = next(event['amount'] for event in events if event['type'] == 'setWin')
+    assert amounts['wincap'] == 5
+    assert amounts['finalWin'] == 5
+    assert base_win + amounts['endFreeSpin'] == 5
+
+
+def test_batch_matches_scalar_with_low_cap(low_variance_config):
+    low_variance_config.max_win = 5
+    scalar = np.array([result['payoutMultiplier'] for result in scalar_payouts(low_variance_config)])
+    batch = BatchSpinEngine(low_variance_config).run(200_000, seed=1).payouts
+
+    assert scalar.max() == batch.max() == 5
+    error = np.hypot(scalar.std(ddof=1) / np.sqrt(scalar.size), batch.std(ddof=1) / np.sqrt(batch.size))
+    assert abs(scalar.mean() - batch.mean()) < 4 * error
+
+    scalar_rate, batch_rate = (scalar >= 5).mean(), (batch >= 5).mean()
+    rate_error = np.sqrt(scalar_rate * (1 - scalar_rate) / scalar.size + batch_rate * (1 - batch_rate) / batch.size)
+    assert abs(scalar_rate - batch_rate) < 4 * rate_error
+
+
+def test_batch_cap_default_game(config):
+    config.max_win = 50
+    payouts = BatchSpinEngine(config).run(200_000, seed=1).payouts
+    assert payouts.max() == 50
+    assert (payouts == 50).any()
+
+
+def test_cache_matches_scalar_with_low_cap(config):
+    config.max_win = 50
+    cache = OutcomeCache(config)
+    results = scalar_payouts(config, 5000, cache)
+    assert any(result['wincap'] for result in results)
+
+    report = cache.evaluate(config, return_payouts=True)
+    assert report['payouts'] == [result['payoutMultiplier'] for result in results]